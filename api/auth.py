@@ -1,55 +1,145 @@
+import asyncio
+import time
 from datetime import timedelta, datetime
 
+import jwt
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
 
 from config import settings
 from controllers.user import user_controller
+from core.auth_cache import get_principal, token_cache_key
+from core.auth_context import AuthContext
+from core.deps import get_auth_context, get_current_user
+from core.permission_registry import encode_mask
+from core.rbac_cache import get_user_permission_mask, get_user_rbac_version, index_user_roles
+from core.redis_manager import redis_manager
+from core.session import bump_session_epoch, verify_session_epoch
 from models.user import User
-from schemas.auth import Token, JWTPayload
+from schemas.auth import Token, JWTPayload, JWTDecoder
+from schemas.rbac import PermissionCheckRequest
 from utils.common import ResponseSchema
 from utils.jwt_utils import TokenType, verify_token
+from utils.rate_limit import check_login_rate_limit
+from utils.response import SchemaRoute
 
-router = APIRouter()
+router = APIRouter(route_class=SchemaRoute)
+
+REFRESH_RESULT_KEY_PREFIX = "auth:refresh:result:"
+REFRESH_LOCK_KEY_PREFIX = "auth:refresh:lock:"
+
+
+async def _permission_snapshot(user: User) -> dict:
+    """access token 中的权限快照，超级管理员无需快照，超出长度限制时不写入"""
+    if not settings.JWT_EMBED_PERMISSIONS or user.is_superuser:
+        return {}
+
+    # 先取版本再取掩码，期间权限变更只会让快照版本过期
+    rbac_ver = await get_user_rbac_version(user.id)
+    perms = encode_mask(await get_user_permission_mask(user.id))
+    if len(perms) > settings.JWT_PERMISSIONS_MAX_BYTES:
+        return {}
+    # 掩码可能来自缓存，签发时重新登记反向索引，保证快照有效期内撤销角色权限能使其失效
+    await index_user_roles(user.id)
+    return {"perms": perms, "rbac_ver": rbac_ver}
+
+
+async def _create_token_pair(user: User, session_epoch: int) -> Token:
+    login_timestamp = int(user.last_login.timestamp())
+    expire = datetime.utcnow() + timedelta(days=settings.ACCESS_TOKEN_EXPIRE_DAYS)
+    data = JWTPayload(
+        user_id=user.id,
+        username=user.username,
+        is_superuser=user.is_superuser,
+        login_time=login_timestamp,
+        session_epoch=session_epoch,
+    )
+    access_token = user_controller.create_token(
+        token_type=TokenType.ACCESS,
+        data=data.model_copy(update=await _permission_snapshot(user)),
+    )
+    refresh_token = user_controller.create_token(token_type=TokenType.REFRESH, data=data)
+    return Token(access_token=access_token, refresh_token=refresh_token, expire=int(expire.timestamp()))
 
 
 @router.post("/login", summary="后台登录登录", response_model=ResponseSchema[Token])
-async def login(login_data: OAuth2PasswordRequestForm = Depends()):
+async def login(
+    login_data: OAuth2PasswordRequestForm = Depends(),
+    _: None = Depends(check_login_rate_limit),
+):
     user: User = await user_controller.authenticate(
         username=login_data.username, 
         password=login_data.password
     )
     await user_controller.update_last_login(user)
-    login_timestamp = int(user.last_login.timestamp())
-    expire = datetime.utcnow() + timedelta(days=settings.ACCESS_TOKEN_EXPIRE_DAYS)
-    access_token = user_controller.create_token(
-        token_type=TokenType.ACCESS,
-        data=JWTPayload(user_id=user.id, username=user.username, is_superuser=user.is_superuser, login_time=login_timestamp))
-    refresh_token = user_controller.create_token(
-        token_type=TokenType.REFRESH,
-        data=JWTPayload(user_id=user.id, username=user.username, is_superuser=user.is_superuser, login_time=login_timestamp))
-    return ResponseSchema(data=Token(access_token=access_token, refresh_token=refresh_token, expire=int(expire.timestamp())))
+    session_epoch = await bump_session_epoch(user.id)
+    return ResponseSchema(data=await _create_token_pair(user, session_epoch))
 
 
 
-@router.post("/refresh", summary="刷新token", response_model=ResponseSchema[Token])
-async def refresh(refresh_token: str):
+async def _rotate_refresh_token(payload: JWTDecoder) -> Token:
+    """签发新的 token 对，并使旧的刷新 token 失效"""
+    await verify_session_epoch(payload)
 
-    payload = verify_token(refresh_token, TokenType.REFRESH)
-    user_id = payload.user_id
-    user = await User.filter(id=user_id).first()
+    user = await get_principal(payload.user_id)
     if not user:
         raise HTTPException(status_code=401, detail="用户不存在")
-    expire = datetime.utcnow() + timedelta(days=settings.ACCESS_TOKEN_EXPIRE_DAYS)
 
-    await user_controller.update_last_login(user)
-    login_timestamp = int(user.last_login.timestamp())
-    access_token = user_controller.create_token(
-        token_type=TokenType.ACCESS,
-        data=JWTPayload(user_id=user.id, username=user.username, is_superuser=user.is_superuser, login_time=login_timestamp))
-    refresh_token = user_controller.create_token(
-        token_type=TokenType.REFRESH,
-        data=JWTPayload(user_id=user.id, username=user.username, is_superuser=user.is_superuser, login_time=login_timestamp))
+    session_epoch = await bump_session_epoch(user.id)
+    return await _create_token_pair(user, session_epoch)
+
+
+@router.post("/refresh", summary="刷新token", response_model=ResponseSchema[Token])
+async def refresh(refresh_token: str):
+    """
+    刷新 token
+
+    同一刷新 token 的并发请求（如多个标签页同时刷新）通过 Redis 锁合并，
+    宽限期内的重复请求直接返回同一组新 token。
+    """
+    try:
+        payload = verify_token(refresh_token, TokenType.REFRESH)
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="刷新token无效或已过期")
+
+    jti = payload.jti or token_cache_key(refresh_token)
+    result_key = f"{REFRESH_RESULT_KEY_PREFIX}{jti}"
+    lock_key = f"{REFRESH_LOCK_KEY_PREFIX}{jti}"
+
+    cached = await redis_manager.get(result_key)
+    if cached:
+        return ResponseSchema(data=Token.model_validate_json(cached))
+
+    if await redis_manager.set(lock_key, "1", expire=settings.REFRESH_LOCK_TIMEOUT, nx=True):
+        try:
+            token = await _rotate_refresh_token(payload)
+            await redis_manager.set(result_key, token.model_dump_json(), expire=settings.REFRESH_GRACE_SECONDS)
+        finally:
+            await redis_manager.delete(lock_key)
+        return ResponseSchema(data=token)
+
+    # 其他请求正在刷新，等待其结果
+    deadline = time.monotonic() + settings.REFRESH_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+        cached = await redis_manager.get(result_key)
+        if cached:
+            return ResponseSchema(data=Token.model_validate_json(cached))
+        if not await redis_manager.exists(lock_key):
+            break
+    raise HTTPException(status_code=401, detail="刷新token无效或已过期")
+
+
+@router.post("/logout", summary="退出登录", response_model=ResponseSchema[bool])
+async def logout(current_user: User = Depends(get_current_user)):
+    await bump_session_epoch(current_user.id)
+    return ResponseSchema(data=True, message="已退出登录")
 
-    return ResponseSchema(data=Token(access_token=access_token, refresh_token=refresh_token, expire=int(expire.timestamp())))
 
+@router.post("/check", summary="批量检查当前用户权限", response_model=ResponseSchema[dict[str, bool]])
+async def check_permissions(
+    check_in: PermissionCheckRequest,
+    context: AuthContext = Depends(get_auth_context),
+):
+    """前端渲染菜单与按钮时一次提交所有待检查的权限，返回 权限 → 是否拥有"""
+    return ResponseSchema(data=await context.check_permissions(check_in.permissions))
@@ -5,34 +5,36 @@
 # @time:2025/08/22 15:00
 # @file:operation_log.py
 
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from tortoise.queryset import QuerySet
 
 from controllers.operation_log import operation_log_crud
 from models.operation_log import OperationLog
-from models.user import User
 from schemas.operation_log import OperationLogResponse
 from schemas.page import QueryParams, get_list_params
 from utils.common import ResponseSchema, PaginationResponse
-from utils.rbac import get_current_superuser_or_permission
+from utils.rbac import get_row_scope
+from utils.response import SchemaRoute
 
-router = APIRouter()
+router = APIRouter(route_class=SchemaRoute)
 
 
 @router.get(
     "/",
     summary="获取操作日志列表",
     response_model=ResponseSchema[PaginationResponse[OperationLogResponse]],
+    response_model_exclude_unset=True,
 )
 async def get_operation_logs(
     params: QueryParams = Depends(get_list_params),
-    current_user: User = Depends(
-        get_current_superuser_or_permission("operation_log", "read")
-    ),
+    scope: QuerySet = Depends(get_row_scope("operation_log", "read", OperationLog)),
 ):
     """获取操作日志列表（分页）"""
     search_fields: list[str] = ["user_name", "module", "action", "path"]
     operation_logs = await operation_log_crud.list(
-        params, OperationLogResponse, search_fields
+        params, OperationLogResponse, search_fields, base_query=scope
     )
     return ResponseSchema(data=operation_logs)
 
@@ -41,15 +43,18 @@ async def get_operation_logs(
     "/{log_id}",
     summary="获取操作日志详情",
     response_model=ResponseSchema[OperationLogResponse],
+    response_model_exclude_unset=True,
 )
 async def get_operation_log(
     log_id: int,
-    current_user: User = Depends(
-        get_current_superuser_or_permission("operation_log", "read")
-    ),
+    fields: Optional[str] = Query(None, description="只返回指定字段，格式: id,module,action"),
+    scope: QuerySet = Depends(get_row_scope("operation_log", "read", OperationLog)),
 ):
     """获取操作日志详情"""
-    operation_log = await operation_log_crud.get(log_id)
+    if fields:
+        operation_log = await operation_log_crud.get_values(log_id, OperationLogResponse, fields, base_query=scope)
+    else:
+        operation_log = await operation_log_crud.get(log_id, base_query=scope)
     if not operation_log:
         raise HTTPException(status_code=404, detail="操作日志不存在")
     return ResponseSchema(data=operation_log)
@@ -59,16 +64,15 @@ async def get_operation_log(
     "/user/{user_id}",
     summary="获取指定用户的操作日志",
     response_model=ResponseSchema[PaginationResponse[OperationLogResponse]],
+    response_model_exclude_unset=True,
 )
 async def get_user_operation_logs(
     user_id: int,
     params: QueryParams = Depends(get_list_params),
-    current_user: User = Depends(
-        get_current_superuser_or_permission("operation_log", "read")
-    ),
+    scope: QuerySet = Depends(get_row_scope("operation_log", "read", OperationLog)),
 ):
     """获取指定用户的操作日志"""
-    queryset = OperationLog.filter(user_id=user_id)
+    queryset = scope.filter(user_id=user_id)
     operation_logs = await operation_log_crud.list_with_queryset(
         queryset, params, OperationLogResponse
     )
@@ -79,16 +83,15 @@ async def get_user_operation_logs(
     "/module/{module_name}",
     summary="获取指定模块的操作日志",
     response_model=ResponseSchema[PaginationResponse[OperationLogResponse]],
+    response_model_exclude_unset=True,
 )
 async def get_module_operation_logs(
     module_name: str,
     params: QueryParams = Depends(get_list_params),
-    current_user: User = Depends(
-        get_current_superuser_or_permission("operation_log", "read")
-    ),
+    scope: QuerySet = Depends(get_row_scope("operation_log", "read", OperationLog)),
 ):
     """获取指定模块的操作日志"""
-    queryset = OperationLog.filter(module=module_name)
+    queryset = scope.filter(module=module_name)
     operation_logs = await operation_log_crud.list_with_queryset(
         queryset, params, OperationLogResponse
     )
@@ -1,16 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException
+import io
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from tortoise.exceptions import IntegrityError
 
 from controllers.permission import permission_controller
+from controllers.user import user_controller
+from core.access_matrix import build_access_matrix
+from core.deps import get_current_superuser
 from models.user import User
+from schemas.auth import UserResponse
 from schemas.page import QueryParams, get_list_params
 from schemas.rbac import PermissionCreate, PermissionUpdate, PermissionResponse
 from utils.auto_log import AutoLogger
 from utils.common import ResponseSchema, PaginationResponse
 from utils.rbac import get_current_superuser_or_permission
 from utils.smart_log import with_auto_log, create_smart_logger_dep
+from utils.response import SchemaRoute
 
-router = APIRouter()
+router = APIRouter(route_class=SchemaRoute)
 
 
 @router.post("/", summary="创建权限", response_model=ResponseSchema[PermissionResponse])
@@ -27,7 +36,7 @@ async def create_permission(
     return ResponseSchema(data=permission)
 
 
-@router.get("/", summary="获取权限列表", response_model=ResponseSchema[PaginationResponse[PermissionResponse]])
+@router.get("/", summary="获取权限列表", response_model=ResponseSchema[PaginationResponse[PermissionResponse]], response_model_exclude_unset=True)
 async def list_permissions(
     params: QueryParams = Depends(get_list_params),
     current_user: User = Depends(get_current_superuser_or_permission("permission", "read"))
@@ -36,6 +45,29 @@ async def list_permissions(
     return ResponseSchema(data=permissions)
 
 
+@router.get("/matrix", summary="导出用户权限访问矩阵")
+async def export_access_matrix(
+    format: Literal["csv", "npz"] = Query("csv", description="导出格式：csv 或 npz（numpy 压缩格式），需要安装可选依赖 export"),
+    current_user: User = Depends(get_current_superuser)
+):
+    try:
+        matrix = await build_access_matrix()
+    except RuntimeError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+    if format == "npz":
+        return StreamingResponse(
+            io.BytesIO(matrix.to_npz()),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": "attachment; filename=access_matrix.npz"},
+        )
+    return StreamingResponse(
+        matrix.iter_csv(),
+        media_type="text/csv",
+        headers={"Content-Disposition": "attachment; filename=access_matrix.csv"},
+    )
+
+
 @router.get("/{permission_id}", summary="获取权限详情", response_model=ResponseSchema[PermissionResponse])
 async def get_permission(
     permission_id: int,
@@ -45,6 +77,18 @@ async def get_permission(
     return ResponseSchema(data=permission)
 
 
+@router.get("/{permission_id}/users", summary="获取拥有该权限的用户", response_model=ResponseSchema[PaginationResponse[UserResponse]], response_model_exclude_unset=True)
+async def list_permission_users(
+    permission_id: int,
+    params: QueryParams = Depends(get_list_params),
+    current_user: User = Depends(get_current_superuser_or_permission("user", "read"))
+):
+    await permission_controller.get(permission_id)
+    base_query = await permission_controller.holders_query(permission_id)
+    users = await user_controller.list(params, UserResponse, ["username", "nickname"], base_query=base_query)
+    return ResponseSchema(data=users)
+
+
 @router.put("/{permission_id}", summary="更新权限", response_model=ResponseSchema[PermissionResponse])
 @with_auto_log("permission")
 async def update_permission(
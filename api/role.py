@@ -4,13 +4,14 @@ from controllers.role import role_controller
 from models.role import Role
 from models.user import User
 from schemas.page import QueryParams, get_list_params
-from schemas.rbac import RoleCreate, RoleUpdate, RoleResponse
+from schemas.rbac import RoleCreate, RoleUpdate, RoleResponse, RowPolicyCreate, RowPolicyResponse
 from utils.auto_log import AutoLogger
 from utils.common import ResponseSchema, PaginationResponse
 from utils.rbac import get_current_superuser_or_permission
 from utils.smart_log import with_auto_log, create_smart_logger_dep
+from utils.response import SchemaRoute
 
-router = APIRouter()
+router = APIRouter(route_class=SchemaRoute)
 
 
 @router.post("/", summary="创建角色", response_model=ResponseSchema[RoleResponse])
@@ -24,7 +25,7 @@ async def create_role(
     return ResponseSchema(data=role)
 
 
-@router.get("/", summary="获取角色列表", response_model=ResponseSchema[PaginationResponse[RoleResponse]])
+@router.get("/", summary="获取角色列表", response_model=ResponseSchema[PaginationResponse[RoleResponse]], response_model_exclude_unset=True)
 async def list_roles(
     params: QueryParams = Depends(get_list_params),
     current_user: User = Depends(get_current_superuser_or_permission("role", "read"))
@@ -63,4 +64,36 @@ async def delete_role(
     auto_logger: AutoLogger = Depends(create_smart_logger_dep("role"))
 ):
     result = await role_controller.delete_role(role_id)
-    return ResponseSchema(data=result)
\ No newline at end of file
+    return ResponseSchema(data=result)
+
+@router.get("/{role_id}/policies", summary="获取角色的行级策略", response_model=ResponseSchema[list[RowPolicyResponse]])
+async def list_role_policies(
+    role_id: int,
+    current_user: User = Depends(get_current_superuser_or_permission("role", "read"))
+):
+    policies = await role_controller.list_policies(role_id)
+    return ResponseSchema(data=[RowPolicyResponse.model_validate(policy) for policy in policies])
+
+
+@router.post("/{role_id}/policies", summary="添加角色的行级策略", response_model=ResponseSchema[RowPolicyResponse])
+@with_auto_log("role")
+async def create_role_policy(
+    role_id: int,
+    policy_create: RowPolicyCreate,
+    current_user: User = Depends(get_current_superuser_or_permission("role", "update")),
+    auto_logger: AutoLogger = Depends(create_smart_logger_dep("role"))
+):
+    policy = await role_controller.create_policy(role_id, policy_create)
+    return ResponseSchema(data=RowPolicyResponse.model_validate(policy))
+
+
+@router.delete("/{role_id}/policies/{policy_id}", summary="删除角色的行级策略", response_model=ResponseSchema[bool])
+@with_auto_log("role")
+async def delete_role_policy(
+    role_id: int,
+    policy_id: int,
+    current_user: User = Depends(get_current_superuser_or_permission("role", "update")),
+    auto_logger: AutoLogger = Depends(create_smart_logger_dep("role"))
+):
+    result = await role_controller.delete_policy(role_id, policy_id)
+    return ResponseSchema(data=result)
@@ -1,16 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException
+from tortoise.queryset import QuerySet
 
 from controllers.user import user_controller
+from core.auth_cache import invalidate_principal
+from core.session import bump_session_epoch
 from core.deps import get_current_active_user
 from models.user import User
 from schemas.auth import UserResponse, UserCreate
 from schemas.page import QueryParams, get_list_params
 from utils.auto_log import AutoLogger
 from utils.common import PaginationResponse, ResponseSchema
-from utils.rbac import get_current_superuser_or_permission
+from utils.rbac import get_current_superuser_or_permission, get_row_scope
 from utils.smart_log import with_auto_log, create_smart_logger_dep
+from utils.response import SchemaRoute
 
-router = APIRouter()
+router = APIRouter(route_class=SchemaRoute)
 
 
 @router.get("/info", summary="获取用户信息", response_model=ResponseSchema[UserResponse])
@@ -27,26 +31,26 @@ async def create_user(
     return ResponseSchema(data=user)
 
 
-@router.get("/list", summary="获取用户列表", response_model=ResponseSchema[PaginationResponse[UserResponse]])
+@router.get("/list", summary="获取用户列表", response_model=ResponseSchema[PaginationResponse[UserResponse]], response_model_exclude_unset=True)
 async def list_users(
     params: QueryParams = Depends(get_list_params),
-    current_user: User = Depends(get_current_superuser_or_permission("user", "read"))
+    scope: QuerySet = Depends(get_row_scope("user", "read", User))
 ):
     # json内搜索使用.语法，并且完全匹配
     search_fields: list[str] = [
         "nickname"
     ]
 
-    users = await user_controller.list(params, UserResponse, search_fields)
+    users = await user_controller.list(params, UserResponse, search_fields, base_query=scope)
     return ResponseSchema(data=users)
 
 
 @router.get("/{user_id}", summary="获取用户详情", response_model=ResponseSchema[UserResponse])
 async def get_user(
     user_id: int,
-    current_user: User = Depends(get_current_superuser_or_permission("user", "read"))
+    scope: QuerySet = Depends(get_row_scope("user", "read", User))
 ):
-    user = await user_controller.get(user_id)
+    user = await user_controller.get(user_id, base_query=scope)
     return ResponseSchema(data=user)
 
 
@@ -54,12 +58,13 @@ async def get_user(
 @with_auto_log("user")
 async def activate_user(
     user_id: int,
-    current_user: User = Depends(get_current_superuser_or_permission("user", "manage")),
+    scope: QuerySet = Depends(get_row_scope("user", "manage", User)),
     auto_logger: AutoLogger = Depends(create_smart_logger_dep("user"))
 ):
-    user = await user_controller.get(user_id)
+    user = await user_controller.get(user_id, base_query=scope)
     user.is_active = True
     await user.save()
+    await invalidate_principal(user.id)
     return ResponseSchema(data=True, message=f"用户{user.id}激活成功")
 
 
@@ -67,15 +72,17 @@ async def activate_user(
 @with_auto_log("user")
 async def deactivate_user(
     user_id: int,
-    current_user: User = Depends(get_current_superuser_or_permission("user", "manage")),
+    scope: QuerySet = Depends(get_row_scope("user", "manage", User)),
     auto_logger: AutoLogger = Depends(create_smart_logger_dep("user"))
 ):
-    user = await user_controller.get(user_id)
+    user = await user_controller.get(user_id, base_query=scope)
 
     if user.is_superuser:
         raise HTTPException(status_code=400, detail="不能禁用超级用户")
     
     user.is_active = False
     await user.save()
+    await invalidate_principal(user.id)
+    await bump_session_epoch(user.id)
     return ResponseSchema(data=True, message=f"用户{user.id}禁用成功")
 
@@ -8,8 +8,9 @@ from utils.auto_log import AutoLogger
 from utils.common import ResponseSchema
 from utils.rbac import get_current_superuser_or_permission
 from utils.smart_log import with_auto_log, create_smart_logger_dep
+from utils.response import SchemaRoute
 
-router = APIRouter()
+router = APIRouter(route_class=SchemaRoute)
 
 
 @router.post("/{user_id}/roles", summary="为用户分配角色", response_model=ResponseSchema[List[UserRoleResponse]])
@@ -15,6 +15,44 @@ class Settings:
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_DAYS: int = 7  # 7 day
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30  # 30 day
+    REFRESH_GRACE_SECONDS: int = int(os.getenv("REFRESH_GRACE_SECONDS", "30"))  # 同一刷新token并发刷新时复用结果的时间窗口
+    REFRESH_LOCK_TIMEOUT: int = int(os.getenv("REFRESH_LOCK_TIMEOUT", "5"))  # 秒
+    # 在 access token 中写入权限快照，权限版本未变化时鉴权无需查询权限
+    JWT_EMBED_PERMISSIONS: bool = os.getenv("JWT_EMBED_PERMISSIONS", "false").lower() == "true"
+    JWT_PERMISSIONS_MAX_BYTES: int = int(os.getenv("JWT_PERMISSIONS_MAX_BYTES", "1024"))  # 编码后超过该长度则不写入快照
+
+    # 认证缓存配置
+    TOKEN_CACHE_MAXSIZE: int = int(os.getenv("TOKEN_CACHE_MAXSIZE", "10000"))
+    PRINCIPAL_CACHE_MAXSIZE: int = int(os.getenv("PRINCIPAL_CACHE_MAXSIZE", "10000"))
+    PRINCIPAL_L1_TTL: int = int(os.getenv("PRINCIPAL_L1_TTL", "5"))  # 秒，多进程部署下用户状态变更的最大延迟
+    PRINCIPAL_CACHE_TTL: int = int(os.getenv("PRINCIPAL_CACHE_TTL", "600"))  # 秒，Redis 二级缓存有效期
+    SESSION_EPOCH_L1_TTL: int = int(os.getenv("SESSION_EPOCH_L1_TTL", "3"))  # 秒，会话纪元进程内缓存有效期
+    RBAC_CACHE_L1_TTL: int = int(os.getenv("RBAC_CACHE_L1_TTL", "300"))  # 秒，权限进程内缓存有效期，正常由发布订阅消息失效
+    RBAC_CACHE_TTL: int = int(os.getenv("RBAC_CACHE_TTL", "3600"))  # 秒，权限 Redis 缓存有效期
+    # 维护 用户 → 有效权限 物化表，加速按权限反查用户；开启后需运行 scripts/init_rbac.py 重建一次
+    RBAC_MATERIALIZE_USER_PERMISSIONS: bool = os.getenv("RBAC_MATERIALIZE_USER_PERMISSIONS", "false").lower() == "true"
+    # 同一主机上各工作进程共享的 RBAC 快照文件（权限表与角色展开后的掩码），建议放在 /dev/shm，为空则不启用
+    RBAC_SNAPSHOT_PATH: str = os.getenv("RBAC_SNAPSHOT_PATH", "")
+
+    # 列表分页配置
+    LIST_COUNT_CACHE_TTL: int = int(os.getenv("LIST_COUNT_CACHE_TTL", "30"))  # 秒，count=estimated 时带筛选条件的总数缓存时间
+    # 总数与当前页并发查询，每个列表请求占用两个连接；连接池较小时可关闭
+    LIST_CONCURRENT_QUERIES: bool = os.getenv("LIST_CONCURRENT_QUERIES", "true").lower() == "true"
+
+    # 密码哈希配置
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))  # 0 表示不使用进程池
+    PASSWORD_HASH_MAX_PENDING: int = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+    # argon2 参数，可通过 scripts/calibrate_argon2.py 按本机性能生成；0 表示使用 passlib 默认值
+    ARGON2_TIME_COST: int = int(os.getenv("ARGON2_TIME_COST", "0"))
+    ARGON2_MEMORY_COST: int = int(os.getenv("ARGON2_MEMORY_COST", "0"))  # KiB
+    ARGON2_PARALLELISM: int = int(os.getenv("ARGON2_PARALLELISM", "0"))
+    ARGON2_TARGET_MS: int = int(os.getenv("ARGON2_TARGET_MS", "250"))  # 校准时单次哈希的目标耗时
+
+    # 限流配置
+    RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "redis")  # redis 或 memory（仅用于测试）
+    LOGIN_RATE_LIMIT_WINDOW: int = int(os.getenv("LOGIN_RATE_LIMIT_WINDOW", "60"))  # 秒
+    LOGIN_RATE_LIMIT_PER_USER: int = int(os.getenv("LOGIN_RATE_LIMIT_PER_USER", "5"))
+    LOGIN_RATE_LIMIT_PER_IP: int = int(os.getenv("LOGIN_RATE_LIMIT_PER_IP", "20"))
 
     # 应用配置
     APP_NAME: str = "RBAC 模版"
@@ -1,5 +1,17 @@
+from typing import Any, Optional, Type
+
+from pydantic import BaseModel
+from tortoise.expressions import Q, Subquery
+from tortoise.queryset import QuerySet
+
+from config import settings
 from core.crud import CRUDBase
-from models.role import Permission
+from core.permission_catalog import permission_catalog
+from core.permission_registry import permission_registry
+from core.rbac_cache import bump_rbac_version
+from models.role import Permission, UserPermission, UserRole
+from models.user import User
+from schemas.page import QueryParams, QueryBuilder
 from schemas.rbac import PermissionCreate, PermissionUpdate
 
 
@@ -7,5 +19,86 @@ class PermissionController(CRUDBase[Permission, PermissionCreate, PermissionUpda
     def __init__(self):
         super().__init__(model=Permission)
 
+    async def list(
+        self,
+        params: QueryParams,
+        response_model: Type[BaseModel],
+        search_fields: Optional[list[str]] = None,
+        base_query: Optional[QuerySet] = None,
+    ) -> dict[str, dict[str, int | Any] | Any]:
+        """无筛选、搜索条件、非游标分页且只按自身字段排序时，直接从进程内权限目录分页"""
+        sort_fields = [field.strip() for field in params.sort.split(",")] if params.sort else []
+        if (
+            base_query is not None
+            or params.cursor is not None
+            or params.filters
+            or params.search
+            or any("__" in field for field in sort_fields)
+        ):
+            return await super().list(params, response_model, search_fields, base_query)
+
+        items = await permission_catalog.all()
+        # 多字段排序：从最后一个字段开始做稳定排序，无效字段忽略
+        for field in reversed(sort_fields):
+            name = field.lstrip("-")
+            if name not in Permission._meta.fields_map:
+                continue
+            items.sort(
+                key=lambda item: (getattr(item, name) is not None, getattr(item, name)),
+                reverse=field.startswith("-"),
+            )
+
+        # 目录已全部在内存中，总数总是精确的；count=none 时与数据库路径一致不返回总数
+        total, total_exact = (None, False) if params.count == "none" else (len(items), True)
+        offset = (params.page - 1) * params.page_size
+        page = items[offset:offset + params.page_size]
+        columns = QueryBuilder.select_fields(Permission, response_model, params.fields)
+        return {
+            "items": (
+                [{name: getattr(item, name) for name in columns} for item in page]
+                if columns
+                else [response_model.model_validate(item) for item in page]
+            ),
+            "pagination": {
+                "total": total,
+                "page": params.page,
+                "page_size": params.page_size,
+                "pages": self._pages(total, params.page_size),
+                "total_exact": total_exact,
+            },
+        }
+
+    async def create(self, obj_in: PermissionCreate, **kwargs) -> Permission:
+        obj = await super().create(obj_in, **kwargs)
+        await bump_rbac_version()
+        return obj
+
+    async def update(self, instance: Permission, obj_in: PermissionUpdate) -> Permission:
+        obj = await super().update(instance, obj_in)
+        await bump_rbac_version()
+        return obj
+
+    async def remove(self, obj: Permission) -> None:
+        await super().remove(obj)
+        await bump_rbac_version()
+
+    async def holders_query(self, permission_id: int) -> QuerySet[User]:
+        """
+        有效拥有该权限的用户查询：启用的超级管理员，以及通过启用的角色（含继承与蕴含规则）获得该权限的启用用户
+
+        开启物化表时直接按 user_permissions 反查，否则为 user_roles → role_closure → role_permissions 的一次子查询。
+        """
+        if settings.RBAC_MATERIALIZE_USER_PERMISSIONS:
+            holders = UserPermission.filter(permission_id=permission_id).values("user_id")
+        else:
+            holders = UserRole.filter(
+                is_active=True,
+                role__is_active=True,
+                role__ancestor_links__ancestor__is_active=True,
+                role__ancestor_links__ancestor__permissions__id__in=await permission_registry.implying_ids(permission_id),
+            ).values("user_id")
+        # 被禁用的用户无法登录，不视为有效拥有
+        return User.filter(Q(is_superuser=True) | Q(id__in=Subquery(holders)), is_active=True)
+
 
 permission_controller = PermissionController()
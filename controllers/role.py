@@ -1,9 +1,17 @@
+from collections import defaultdict, deque
+from typing import Optional
+
 from fastapi import HTTPException
 
 from core.crud import CRUDBase
-from models.role import Role, Permission, UserRole
-from schemas.rbac import RoleCreate, RoleUpdate
+from core.rbac_cache import invalidate_roles
+from core.row_policy import POLICY_ACTIONS, POLICY_RESOURCES, compile_condition
+from models.policy import RowPolicy
+from models.role import Role, Permission, UserRole, RoleInheritance, RoleClosure
+from models.user import User
+from schemas.rbac import RoleCreate, RoleUpdate, RowPolicyCreate
 from tortoise.exceptions import IntegrityError
+from tortoise.transactions import in_transaction
 
 
 class RoleController(CRUDBase[Role, RoleCreate, RoleUpdate]):
@@ -11,34 +19,53 @@ class RoleController(CRUDBase[Role, RoleCreate, RoleUpdate]):
         super().__init__(model=Role)
 
     async def create_role(self, obj_in: RoleCreate) -> Role:
+        # 先校验再写入，所有写入在同一事务中完成，失败时不留下部分数据
+        if obj_in.parent_ids:
+            await self._check_parents(None, obj_in.parent_ids)
         try:
-            role_data = obj_in.model_dump(exclude={'permission_ids'})
-            role = await self.create(role_data)
+            async with in_transaction():
+                role_data = obj_in.model_dump(exclude={'permission_ids', 'parent_ids'})
+                role = await self.create(role_data)
+                await RoleClosure.create(ancestor_id=role.id, descendant_id=role.id, depth=0)
 
-            if obj_in.permission_ids:
-                permissions = await Permission.filter(id__in=obj_in.permission_ids)
-                await role.permissions.add(*permissions)
+                if obj_in.permission_ids:
+                    permissions = await Permission.filter(id__in=obj_in.permission_ids)
+                    await role.permissions.add(*permissions)
 
-            return await Role.get(id=role.id).prefetch_related('permissions')
+                if obj_in.parent_ids:
+                    await self._replace_parents(role.id, obj_in.parent_ids)
         except IntegrityError:
             raise HTTPException(status_code=400, detail="角色名称或代码已存在")
 
+        await invalidate_roles([role.id])
+        return await Role.get(id=role.id).prefetch_related('permissions')
+
     async def update_role(self, role_id: int, obj_in: RoleUpdate) -> Role:
         role = await Role.get_or_none(id=role_id)
         if not role:
             raise HTTPException(status_code=404, detail="角色不存在")
+        if obj_in.parent_ids is not None:
+            await self._check_parents(role_id, obj_in.parent_ids)
 
-        update_data = obj_in.model_dump(exclude_unset=True, exclude={'permission_ids'})
-        if update_data:
-            await role.update_from_dict(update_data)
-            await role.save()
-
-        if obj_in.permission_ids is not None:
-            await role.permissions.clear()
-            if obj_in.permission_ids:
-                permissions = await Permission.filter(id__in=obj_in.permission_ids)
-                await role.permissions.add(*permissions)
+        update_data = obj_in.model_dump(exclude_unset=True, exclude={'permission_ids', 'parent_ids'})
+        try:
+            async with in_transaction():
+                if update_data:
+                    await role.update_from_dict(update_data)
+                    await role.save()
+
+                if obj_in.permission_ids is not None:
+                    await role.permissions.clear()
+                    if obj_in.permission_ids:
+                        permissions = await Permission.filter(id__in=obj_in.permission_ids)
+                        await role.permissions.add(*permissions)
+
+                if obj_in.parent_ids is not None:
+                    await self._replace_parents(role_id, obj_in.parent_ids)
+        except IntegrityError:
+            raise HTTPException(status_code=400, detail="角色名称或代码已存在")
 
+        await invalidate_roles([role_id])
         return await Role.get(id=role_id).prefetch_related('permissions')
 
     async def get_role_with_permissions(self, role_id: int) -> Role:
@@ -60,8 +87,146 @@ class RoleController(CRUDBase[Role, RoleCreate, RoleUpdate]):
         if user_count > 0:
             raise HTTPException(status_code=400, detail="该角色正在被使用，无法删除")
 
-        await role.delete()
+        # 删除角色会断开其子角色的继承关系，需要重建后代角色的闭包
+        descendant_ids = set(await self._descendant_ids(role_id)) - {role_id}
+        async with in_transaction():
+            await RoleInheritance.filter(parent_id=role_id).delete()
+            await RoleInheritance.filter(child_id=role_id).delete()
+            await RoleClosure.filter(ancestor_id=role_id).delete()
+            await RoleClosure.filter(descendant_id=role_id).delete()
+            await role.delete()
+            await self._rebuild_closure(descendant_ids)
+        await invalidate_roles([role_id, *descendant_ids])
         return True
 
+    async def list_policies(self, role_id: int) -> list[RowPolicy]:
+        return await RowPolicy.filter(role_id=role_id).order_by("id")
+
+    async def create_policy(self, role_id: int, obj_in: RowPolicyCreate) -> RowPolicy:
+        if not await Role.exists(id=role_id):
+            raise HTTPException(status_code=404, detail="角色不存在")
+        model = POLICY_RESOURCES.get(obj_in.resource)
+        if model is None:
+            raise HTTPException(status_code=400, detail=f"资源 {obj_in.resource} 不支持行级策略")
+        if obj_in.action not in POLICY_ACTIONS[obj_in.resource]:
+            raise HTTPException(
+                status_code=400, detail=f"{obj_in.resource}:{obj_in.action} 不支持行级策略"
+            )
+        try:
+            compile_condition(model, obj_in.condition, User())
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"策略条件无效: {e}")
+
+        policy = await RowPolicy.create(role_id=role_id, **obj_in.model_dump())
+        # 策略变更与权限变更一样递增相关用户的权限版本，已编译的行过滤条件随之失效
+        await invalidate_roles([role_id])
+        return policy
+
+    async def delete_policy(self, role_id: int, policy_id: int) -> bool:
+        deleted = await RowPolicy.filter(id=policy_id, role_id=role_id).delete()
+        if not deleted:
+            raise HTTPException(status_code=404, detail="策略不存在")
+        await invalidate_roles([role_id])
+        return True
+
+    async def set_parents(self, role_id: int, parent_ids: list[int]) -> None:
+        """
+        设置角色的父角色，增加的继承关系增量写入闭包，移除的继承关系重建受影响的后代角色闭包
+
+        调用方负责在变更后使该角色的权限缓存失效（权限缓存按祖先角色建立索引，失效该角色即覆盖所有后代角色的用户）
+        """
+        await self._check_parents(role_id, parent_ids)
+        async with in_transaction():
+            await self._replace_parents(role_id, parent_ids)
+
+    async def _check_parents(self, role_id: Optional[int], parent_ids: list[int]) -> None:
+        """校验父角色均存在且不会形成循环，role_id 为 None 表示新建角色"""
+        parent_ids = set(parent_ids)
+        if await Role.filter(id__in=parent_ids).count() != len(parent_ids):
+            raise HTTPException(status_code=400, detail="部分父角色不存在")
+        # 父角色是角色自身或其后代时会形成循环
+        if role_id is not None and parent_ids & set(await self._descendant_ids(role_id)):
+            raise HTTPException(status_code=400, detail="角色继承关系不能形成循环")
+
+    async def _replace_parents(self, role_id: int, parent_ids: list[int]) -> None:
+        """写入继承关系与闭包，需已通过 _check_parents 校验并在事务中调用"""
+        parent_ids = set(parent_ids)
+        current = set(await RoleInheritance.filter(child_id=role_id).values_list("parent_id", flat=True))
+        removed = current - parent_ids
+        if removed:
+            await RoleInheritance.filter(child_id=role_id, parent_id__in=removed).delete()
+            await self._rebuild_closure(await self._descendant_ids(role_id))
+        for parent_id in parent_ids - current:
+            await self._add_parent(parent_id, role_id)
+
+    async def _add_parent(self, parent_id: int, child_id: int) -> None:
+        # 父角色已是子角色自身或其后代时会形成循环
+        if parent_id == child_id or await RoleClosure.exists(ancestor_id=child_id, descendant_id=parent_id):
+            raise HTTPException(status_code=400, detail="角色继承关系不能形成循环")
+
+        await RoleInheritance.create(parent_id=parent_id, child_id=child_id)
+
+        # 父角色的每个祖先 × 子角色的每个后代，层级取最短路径
+        ancestors = await RoleClosure.filter(descendant_id=parent_id).values_list("ancestor_id", "depth")
+        descendants = await RoleClosure.filter(ancestor_id=child_id).values_list("descendant_id", "depth")
+        existing = {
+            (ancestor_id, descendant_id): (closure_id, depth)
+            for closure_id, ancestor_id, descendant_id, depth in await RoleClosure.filter(
+                ancestor_id__in=[ancestor_id for ancestor_id, _ in ancestors],
+                descendant_id__in=[descendant_id for descendant_id, _ in descendants],
+            ).values_list("id", "ancestor_id", "descendant_id", "depth")
+        }
+        new_rows = []
+        for ancestor_id, up in ancestors:
+            for descendant_id, down in descendants:
+                depth = up + down + 1
+                current = existing.get((ancestor_id, descendant_id))
+                if current is None:
+                    new_rows.append(RoleClosure(ancestor_id=ancestor_id, descendant_id=descendant_id, depth=depth))
+                elif depth < current[1]:
+                    await RoleClosure.filter(id=current[0]).update(depth=depth)
+        if new_rows:
+            await RoleClosure.bulk_create(new_rows)
+
+    async def _descendant_ids(self, role_id: int) -> list[int]:
+        return await RoleClosure.filter(ancestor_id=role_id).values_list("descendant_id", flat=True)
+
+    async def _rebuild_closure(self, role_ids) -> None:
+        """按继承关系重新计算指定角色（作为后代）的全部闭包记录"""
+        role_ids = set(role_ids)
+        if not role_ids:
+            return
+
+        parents = defaultdict(list)
+        for child_id, parent_id in await RoleInheritance.all().values_list("child_id", "parent_id"):
+            parents[child_id].append(parent_id)
+
+        rows = []
+        for role_id in role_ids:
+            depths = {role_id: 0}
+            queue = deque([role_id])
+            while queue:
+                current = queue.popleft()
+                for parent_id in parents[current]:
+                    if parent_id not in depths:
+                        depths[parent_id] = depths[current] + 1
+                        queue.append(parent_id)
+            rows += [
+                RoleClosure(ancestor_id=ancestor_id, descendant_id=role_id, depth=depth)
+                for ancestor_id, depth in depths.items()
+            ]
+        await RoleClosure.filter(descendant_id__in=role_ids).delete()
+        await RoleClosure.bulk_create(rows)
+
+    async def ensure_closure(self) -> int:
+        """补齐缺少闭包自身记录的角色（如启用角色继承前创建的角色），返回补齐的数量"""
+        existing = set(await RoleClosure.filter(depth=0).values_list("descendant_id", flat=True))
+        missing = [role_id for role_id in await Role.all().values_list("id", flat=True) if role_id not in existing]
+        if missing:
+            await RoleClosure.bulk_create(
+                [RoleClosure(ancestor_id=role_id, descendant_id=role_id, depth=0) for role_id in missing]
+            )
+        return len(missing)
+
 
 role_controller = RoleController()
@@ -3,6 +3,7 @@ from typing import List
 from fastapi import HTTPException
 
 from core.crud import CRUDBase
+from core.rbac_cache import invalidate_users
 from models.role import Role, UserRole
 from models.user import User
 from schemas.rbac import (
@@ -33,7 +34,8 @@ class UserRoleController(CRUDBase[UserRole, None, None]):
         for role_id in role_request.role_ids:
             user_role = await UserRole.create(user_id=user_id, role_id=role_id)
             user_roles.append(user_role)
-        
+
+        await invalidate_users([user_id])
         return await UserRole.filter(user_id=user_id).prefetch_related('role', 'role__permissions')
 
     async def get_user_roles(self, user_id: int) -> List[UserRole]:
@@ -49,6 +51,7 @@ class UserRoleController(CRUDBase[UserRole, None, None]):
             raise HTTPException(status_code=404, detail="用户角色关联不存在")
         
         await user_role.delete()
+        await invalidate_users([user_id])
         return True
 
     async def get_user_with_roles_and_permissions(self, user_id: int) -> dict:
@@ -56,17 +59,12 @@ class UserRoleController(CRUDBase[UserRole, None, None]):
         if not user:
             raise HTTPException(status_code=404, detail="用户不存在")
         
-        roles = []
-        all_permissions = []
-        
-        for user_role in user.user_roles:
-            if user_role.is_active and user_role.role.is_active:
-                roles.append(user_role.role)
-                permissions = await user_role.role.permissions.all()
-                all_permissions.extend(permissions)
-        
-        # 去重权限
-        unique_permissions = list({perm.id: perm for perm in all_permissions}.values())
+        roles = [
+            user_role.role for user_role in user.user_roles
+            if user_role.is_active and user_role.role.is_active
+        ]
+        # 有效权限包含从父角色继承的权限
+        unique_permissions = await User.permission_query(user_id).distinct()
         
         return {
             "user": user,
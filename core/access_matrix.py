@@ -0,0 +1,119 @@
+"""
+用户 × 权限访问矩阵
+
+由 user_roles、role_closure、role_permissions 构建关联矩阵，用矩阵乘法一次得到所有用户的有效权限，
+用于合规审计导出。依赖 numpy（可选依赖 export，仅导出时需要：uv sync --extra export）。
+"""
+
+import csv
+import io
+from typing import Iterator
+
+from core.permission_registry import PermissionRegistry
+from models.role import Permission, Role, RoleClosure, UserRole
+from models.user import User
+
+
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError("导出访问矩阵需要安装 numpy，请安装可选依赖 export：uv sync --extra export 或 pip install numpy")
+    return numpy
+
+
+class AccessMatrix:
+    """访问矩阵，matrix[i, j] 表示第 i 个用户拥有第 j 个权限"""
+
+    def __init__(self, user_ids, usernames, permission_ids, permission_codes, matrix):
+        self.user_ids = user_ids
+        self.usernames = usernames
+        self.permission_ids = permission_ids
+        self.permission_codes = permission_codes
+        self.matrix = matrix
+
+    def iter_csv(self, chunk_size: int = 1000) -> Iterator[str]:
+        """按块生成 CSV 文本，首行为权限代码"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(["user_id", "username", *self.permission_codes])
+        for start in range(0, len(self.user_ids), chunk_size):
+            rows = self.matrix[start:start + chunk_size].astype("uint8").tolist()
+            for user_id, username, row in zip(
+                self.user_ids[start:start + chunk_size], self.usernames[start:start + chunk_size], rows
+            ):
+                writer.writerow([user_id, username, *row])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    def to_npz(self) -> bytes:
+        np = _import_numpy()
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            matrix=self.matrix,
+            user_ids=np.asarray(self.user_ids, dtype=np.int64),
+            usernames=np.asarray(self.usernames, dtype=str),
+            permission_ids=np.asarray(self.permission_ids, dtype=np.int64),
+            permission_codes=np.asarray(self.permission_codes, dtype=str),
+        )
+        return buffer.getvalue()
+
+
+async def build_access_matrix() -> AccessMatrix:
+    """
+    构建访问矩阵
+
+    有效权限 = 用户×角色 · (角色×祖先角色 · 角色×权限 · 权限蕴含)，
+    只计入启用的用户角色关联、启用的角色与启用的祖先角色；超级管理员拥有全部权限。
+    """
+    np = _import_numpy()
+
+    users = await User.all().order_by("id").values_list("id", "username", "is_superuser")
+    permissions = await Permission.all().order_by("id").values_list("id", "code", "resource", "action")
+    role_ids = await Role.all().order_by("id").values_list("id", flat=True)
+
+    user_index = {user_id: i for i, (user_id, _, _) in enumerate(users)}
+    role_index = {role_id: i for i, role_id in enumerate(role_ids)}
+    permission_index = {permission_id: i for i, (permission_id, _, _, _) in enumerate(permissions)}
+
+    # 用户 × 角色：启用的关联且角色启用
+    user_roles = np.zeros((len(users), len(role_ids)), dtype=np.int32)
+    for user_id, role_id in await UserRole.filter(is_active=True, role__is_active=True).values_list("user_id", "role_id"):
+        user_roles[user_index[user_id], role_index[role_id]] = 1
+
+    # 角色 × 祖先角色：只保留启用的祖先
+    ancestors = np.zeros((len(role_ids), len(role_ids)), dtype=np.int32)
+    for descendant_id, ancestor_id in await RoleClosure.filter(ancestor__is_active=True).values_list(
+        "descendant_id", "ancestor_id"
+    ):
+        ancestors[role_index[descendant_id], role_index[ancestor_id]] = 1
+
+    # 角色 × 权限：直接授予
+    grants = np.zeros((len(role_ids), len(permissions)), dtype=np.int32)
+    for role_id, permission_id in await Role.filter(permissions__id__isnull=False).values_list("id", "permissions__id"):
+        grants[role_index[role_id], permission_index[permission_id]] = 1
+
+    # 权限 × 权限：自身及通配/蕴含规则
+    implications = np.eye(len(permissions), dtype=np.int32)
+    implied = PermissionRegistry._compile_implications(
+        [(permission_id, resource, action) for permission_id, _, resource, action in permissions]
+    )
+    for permission_id, implied_ids in implied.items():
+        for implied_id in implied_ids:
+            implications[permission_index[permission_id], permission_index[implied_id]] = 1
+
+    role_access = ((ancestors @ grants @ implications) > 0).astype(np.int32)
+    matrix = (user_roles @ role_access) > 0
+    matrix[[i for i, (_, _, is_superuser) in enumerate(users) if is_superuser]] = True
+
+    return AccessMatrix(
+        user_ids=[user_id for user_id, _, _ in users],
+        usernames=[username for _, username, _ in users],
+        permission_ids=[permission_id for permission_id, _, _, _ in permissions],
+        permission_codes=[code for _, code, _, _ in permissions],
+        matrix=matrix,
+    )
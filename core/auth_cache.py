@@ -0,0 +1,106 @@
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Optional
+
+from redis.exceptions import RedisError
+
+from config import settings
+from core.cache import TTLCache
+from core.redis_manager import redis_manager
+from models.user import User
+from schemas.auth import JWTDecoder
+
+PRINCIPAL_KEY_PREFIX = "auth:principal:"
+
+logger = logging.getLogger(__name__)
+
+# 已验证 token 的 payload 缓存，键为 token 摘要
+token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_MAXSIZE)
+# 用户数据一级缓存（进程内），键为用户ID；二级缓存位于 Redis
+principal_cache = TTLCache(maxsize=settings.PRINCIPAL_CACHE_MAXSIZE, ttl=settings.PRINCIPAL_L1_TTL)
+
+
+def token_cache_key(token: str) -> str:
+    """缓存键使用 token 的摘要，避免在内存中保存原始 token"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def get_cached_token(token: str) -> Optional[JWTDecoder]:
+    return token_cache.get(token_cache_key(token))
+
+
+def cache_token(token: str, payload: JWTDecoder) -> None:
+    """缓存已验证的 token payload，直到 token 过期"""
+    token_cache.set(token_cache_key(token), payload, ttl=payload.exp - time.time())
+
+
+def dump_user_row(user: User) -> dict[str, Any]:
+    """
+    将用户实例导出为数据库列字典，用于缓存后重建实例
+
+    密码哈希不写入缓存（置为 None），缓存的用户实例不能用于校验密码，也不能整行保存
+    """
+    row = {
+        column: getattr(user, field)
+        for field, column in User._meta.fields_db_projection.items()
+    }
+    row[User._meta.fields_db_projection["password"]] = None
+    return row
+
+
+def load_user_row(row: dict[str, Any]) -> User:
+    """从缓存的列字典重建用户实例，每次调用返回新对象"""
+    return User._init_from_db(**row)
+
+
+async def get_principal(user_id: int) -> Optional[User]:
+    """
+    获取用户实例，依次查询进程内缓存、Redis 与数据库
+
+    Returns:
+        User: 每次返回新的实例，调用方可以安全修改；不含密码哈希（password 为 None），
+        校验密码需从数据库读取（见 UserController.authenticate）；用户不存在时返回 None
+    """
+    row = principal_cache.get(user_id)
+    if row is not None:
+        return load_user_row(row)
+
+    key = f"{PRINCIPAL_KEY_PREFIX}{user_id}"
+    try:
+        cached = await redis_manager.get(key)
+    except RedisError:
+        cached = None
+    if cached:
+        row = json.loads(cached)
+        principal_cache.set(user_id, row)
+        return load_user_row(row)
+
+    user = await User.filter(id=user_id).first()
+    if not user:
+        return None
+
+    row = dump_user_row(user)
+    principal_cache.set(user_id, row)
+    try:
+        await redis_manager.set(
+            key, json.dumps(row, default=lambda v: v.isoformat()), expire=settings.PRINCIPAL_CACHE_TTL
+        )
+    except RedisError:
+        pass
+    # 与缓存命中时一致，返回不含密码哈希的实例
+    return load_user_row(row)
+
+
+async def invalidate_principal(user_id: int) -> None:
+    """
+    用户数据变更后调用，清除该用户的一级与二级缓存
+
+    调用时数据库写入已提交，Redis 不可用时只记录日志，二级缓存在 PRINCIPAL_CACHE_TTL 后过期
+    """
+    principal_cache.delete(user_id)
+    try:
+        await redis_manager.delete(f"{PRINCIPAL_KEY_PREFIX}{user_id}")
+    except RedisError:
+        logger.warning("清除用户 %s 的 Redis 缓存失败，等待缓存过期", user_id, exc_info=True)
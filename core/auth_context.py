@@ -0,0 +1,59 @@
+from typing import Optional
+
+from fastapi import Request
+
+from core.permission_registry import permission_registry
+from models.role import Permission, Role
+from models.user import User
+from schemas.auth import JWTDecoder
+
+
+class AuthContext:
+    """
+    单次请求内的授权上下文，保存在 request.state.auth_context
+
+    同一请求中的所有依赖链共用同一个用户实例，角色与权限在该实例上只加载一次。
+    token 中带有权限快照时交给用户实例，权限版本未变化时直接使用。
+    """
+
+    def __init__(self, user: User, payload: JWTDecoder):
+        self.user = user
+        self.payload = payload
+        if payload.perms is not None and payload.rbac_ver is not None:
+            user._token_snapshot = (payload.rbac_ver, payload.perms)
+
+    async def roles(self) -> list[Role]:
+        return await self.user.get_roles()
+
+    async def permissions(self) -> list[Permission]:
+        return await self.user.get_permissions()
+
+    async def permission_mask(self) -> bytes:
+        return await self.user.get_permission_mask()
+
+    async def has_permission(self, resource: str, action: str) -> bool:
+        return await self.user.has_permission(resource, action)
+
+    async def check_permissions(self, codes: list[str]) -> dict[str, bool]:
+        """
+        批量检查权限，所有权限基于同一个位掩码判断
+
+        Args:
+            codes: 权限列表，格式为 resource:action
+
+        Returns:
+            dict: 权限 → 是否拥有
+        """
+        if self.user.is_superuser:
+            return dict.fromkeys(codes, True)
+
+        pairs = {code: tuple(code.partition(":")[::2]) for code in codes}
+        results = await permission_registry.check_many(await self.permission_mask(), pairs.values())
+        return {code: results[pair] for code, pair in pairs.items()}
+
+    async def has_any_role(self, role_codes: list[str]) -> bool:
+        return await self.user.has_any_role(role_codes)
+
+
+def get_request_auth_context(request: Request) -> Optional[AuthContext]:
+    return getattr(request.state, "auth_context", None)
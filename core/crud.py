@@ -1,7 +1,9 @@
+import asyncio
 from typing import (
     Any,
     Dict,
     Generic,
+    List,
     NewType,
     Type,
     TypeVar,
@@ -9,10 +11,14 @@ from typing import (
     Optional,
 )
 
+from fastapi import HTTPException
 from pydantic import BaseModel
+from tortoise.backends.base.client import TransactionalDBClient
 from tortoise.models import Model
 from tortoise.queryset import QuerySet
 
+from config import settings
+from core.cache import TTLCache
 from schemas.page import QueryParams, QueryBuilder
 from utils.exception import get_object_or_404
 
@@ -22,6 +28,9 @@ ModelType = TypeVar("ModelType", bound=Model)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
+# 估算模式下带筛选条件的查询总数，按 SQL 缓存
+count_cache = TTLCache(maxsize=1024, ttl=settings.LIST_COUNT_CACHE_TTL)
+
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(self, model: Type[ModelType]):
@@ -31,6 +40,17 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         query_source = base_query if base_query is not None else self.model
         return await get_object_or_404(query_source, id=id, **kwargs)
 
+    async def get_values(
+        self, id: int, response_model: Type[BaseModel], fields: str, base_query: Optional[QuerySet] = None
+    ) -> dict[str, Any]:
+        """只查询 fields 指定的列，直接返回字典，不创建模型实例"""
+        query_source = base_query if base_query is not None else self.model.all()
+        columns = QueryBuilder.select_fields(self.model, response_model, fields)
+        item = await query_source.filter(id=id).first().values(*columns)
+        if item is None:
+            raise HTTPException(status_code=404, detail=f"{self.model.__name__} not found")
+        return item
+
     async def list(
         self,
         params: QueryParams,
@@ -52,8 +72,11 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             query, params.search, search_fields or []
         )
 
-        # 计算总数
-        total = await query.count()
+        # 指定 fields 时只查询所需列，结果为字典，不创建模型实例也不逐行校验
+        columns = QueryBuilder.select_fields(self.model, response_model, params.fields)
+
+        if params.cursor is not None:
+            return await self._list_by_cursor(query, params, response_model, columns)
 
         # 应用排序
         query = await QueryBuilder.apply_sorting(query, params.sort)
@@ -63,26 +86,134 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             query, params.page, params.page_size
         )
 
-        # 执行查询
-        items = await paginated_query
+        if columns:
+            paginated_query = paginated_query.values(*columns)
 
-        # 计算分页信息
-        pages = (total + params.page_size - 1) // params.page_size if total > 0 else 0
+        # 计算总数与查询当前页互不依赖，同时执行
+        (total, total_exact), items = await self._run_queries(
+            self._count(query, params.count), paginated_query
+        )
 
-        items_pydantic = [response_model.model_validate(item) for item in items]
+        if not columns:
+            items = [response_model.model_validate(item) for item in items]
 
         results = {
-            "items": items_pydantic,
+            "items": items,
             "pagination": {
                 "total": total,
                 "page": params.page,
                 "page_size": params.page_size,
-                "pages": pages,
+                "pages": self._pages(total, params.page_size),
+                "total_exact": total_exact,
             },
         }
 
         return results
 
+    async def _list_by_cursor(
+        self,
+        query: QuerySet,
+        params: QueryParams,
+        response_model: Type[BaseModel],
+        columns: Optional[List[str]] = None,
+    ) -> dict[str, dict[str, int | Any] | Any]:
+        """游标分页：按排序键定位而非 OFFSET，任意深度的页与第一页代价相同"""
+        keys = QueryBuilder.cursor_keys(self.model, params.sort)
+        values, direction = None, "next"
+        if params.cursor:
+            values, direction = QueryBuilder.decode_cursor(self.model, params.cursor, keys)
+
+        # 多取一条判断该方向上是否还有数据
+        page_query = QueryBuilder.apply_cursor(query, keys, values, direction).limit(params.page_size + 1)
+        if columns:
+            # 生成游标需要排序键的值
+            page_query = page_query.values(*dict.fromkeys([*columns, *(name for name, _ in keys)]))
+        (total, total_exact), rows = await self._run_queries(self._count(query, params.count), page_query)
+        has_more = len(rows) > params.page_size
+        items = rows[:params.page_size]
+        if direction == "prev":
+            items.reverse()
+            has_next, has_prev = bool(items), has_more
+        else:
+            has_next, has_prev = has_more, values is not None and bool(items)
+
+        next_cursor = QueryBuilder.encode_cursor(items[-1], keys, "next") if has_next else None
+        prev_cursor = QueryBuilder.encode_cursor(items[0], keys, "prev") if has_prev else None
+        if columns:
+            items = [{name: item[name] for name in columns} for item in items]
+        else:
+            items = [response_model.model_validate(item) for item in items]
+
+        return {
+            "items": items,
+            "pagination": {
+                "total": total,
+                "page": params.page,
+                "page_size": params.page_size,
+                "pages": self._pages(total, params.page_size),
+                "total_exact": total_exact,
+                "next_cursor": next_cursor,
+                "prev_cursor": prev_cursor,
+            },
+        }
+
+    async def _run_queries(self, *queries) -> List:
+        """
+        执行互不依赖的查询
+
+        不在事务中时并发执行，每个查询各自从连接池获取连接（连接池上限可在 DATABASE_URL 中用 maxsize 调整）；
+        事务内所有查询共用同一连接，无法并发，按顺序执行；LIST_CONCURRENT_QUERIES 关闭时也按顺序执行
+        """
+        if not settings.LIST_CONCURRENT_QUERIES or isinstance(self.model._meta.db, TransactionalDBClient):
+            return [await query for query in queries]
+        return list(await asyncio.gather(*queries))
+
+    async def _count(self, query: QuerySet, mode: str) -> tuple[Optional[int], bool]:
+        """
+        按计数模式计算总数，返回 (总数, 是否精确)
+
+        exact: COUNT(*)；none: 不计数；estimated: 无筛选条件时读取 PostgreSQL 统计信息（pg_class.reltuples），
+        有筛选条件或统计信息不可用时使用短时缓存的精确计数
+        """
+        if mode == "none":
+            return None, False
+        if mode == "exact":
+            return await query.count(), True
+
+        count_query = query.count()
+        sql = count_query.sql(params_inline=True)
+        if sql == self.model.all().count().sql(params_inline=True):
+            estimate = await self._estimate_rows()
+            if estimate is not None:
+                return estimate, False
+
+        key = (self.model.__name__, sql)
+        total = count_cache.get(key)
+        if total is not None:
+            return total, False
+        total = await count_query
+        count_cache.set(key, total)
+        return total, True
+
+    async def _estimate_rows(self) -> Optional[int]:
+        """表行数估算，非 PostgreSQL 或表尚未分析（reltuples < 0）时返回 None"""
+        db = self.model._meta.db
+        if db.capabilities.dialect != "postgres":
+            return None
+        rows = await db.execute_query_dict(
+            "SELECT reltuples::bigint AS estimate FROM pg_class WHERE oid = to_regclass($1)",
+            [self.model._meta.db_table],
+        )
+        if not rows or rows[0]["estimate"] < 0:
+            return None
+        return rows[0]["estimate"]
+
+    @staticmethod
+    def _pages(total: Optional[int], page_size: int) -> Optional[int]:
+        if total is None:
+            return None
+        return (total + page_size - 1) // page_size if total > 0 else 0
+
     async def create(self, obj_in: CreateSchemaType, **kwargs) -> ModelType:
         if isinstance(obj_in, Dict):
             obj_dict = obj_in
@@ -1,7 +1,10 @@
 import jwt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 
+from core.auth_context import AuthContext, get_request_auth_context
+from core.auth_cache import cache_token, get_cached_token, get_principal
+from core.session import verify_session_epoch
 from models.user import User
 from utils.jwt_utils import verify_token, TokenType
 
@@ -11,59 +14,61 @@ oauth2_scheme = OAuth2PasswordBearer(
     auto_error=True
 )
 
-async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
-    """获取当前用户"""
+async def get_current_user(request: Request, token: str = Depends(oauth2_scheme)) -> User:
+    """获取当前用户，结果保存在请求的授权上下文中，同一请求内只解析一次"""
+    context = get_request_auth_context(request)
+    if context is not None:
+        return context.user
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
-    try:
-        payload = verify_token(token, TokenType.ACCESS)
-        user_id: int = payload.user_id
-        if user_id is None:
-            raise credentials_exception
-
-    except jwt.DecodeError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token",
-            headers={"WWW-Authenticate": "Bearer"}
-        )
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token has expired",
-            headers={"WWW-Authenticate": "Bearer"}
-        )
-    except jwt.InvalidTokenError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token type",
-            headers={"WWW-Authenticate": "Bearer"}
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Authentication error: {str(e)}"
-        )
-    
-    user = await User.filter(id=user_id).first()
-    if not user:
-        raise credentials_exception
-    
-    # 验证token中的登录时间是否与用户当前登录时间匹配
-    if hasattr(payload, 'login_time') and user.last_login:
-        token_login_time = payload.login_time
-        user_login_time = int(user.last_login.timestamp())
-        if token_login_time != user_login_time:
+
+    # 命中缓存时跳过 token 解码
+    payload = get_cached_token(token)
+    if payload is None:
+        try:
+            payload = verify_token(token, TokenType.ACCESS)
+            user_id: int = payload.user_id
+            if user_id is None:
+                raise credentials_exception
+
+        except jwt.DecodeError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token has been invalidated, please login again",
+                detail="Invalid token",
                 headers={"WWW-Authenticate": "Bearer"}
             )
-    
+        except jwt.ExpiredSignatureError:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has expired",
+                headers={"WWW-Authenticate": "Bearer"}
+            )
+        except jwt.InvalidTokenError:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid token type",
+                headers={"WWW-Authenticate": "Bearer"}
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Authentication error: {str(e)}"
+            )
+        cache_token(token, payload)
+
+    # 会话纪元校验，登录、刷新、登出或禁用后旧 token 失效
+    await verify_session_epoch(payload)
+
+    # 用户数据优先从进程内缓存与 Redis 读取
+    user = await get_principal(payload.user_id)
+    if not user:
+        raise credentials_exception
+
+    request.state.auth_context = AuthContext(user, payload)
     return user
 
 
@@ -91,6 +96,14 @@ async def get_current_superuser(
     return current_user
 
 
+async def get_auth_context(
+        request: Request,
+        current_user: User = Depends(get_current_active_user),
+) -> AuthContext:
+    """获取当前请求的授权上下文"""
+    return get_request_auth_context(request)
+
+
 async def get_current_admin_user(
         current_user: User = Depends(get_current_active_user),
 ) -> User:
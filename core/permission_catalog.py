@@ -0,0 +1,48 @@
+from typing import Iterable, Optional
+
+from models.role import Permission
+
+
+class PermissionCatalog:
+    """
+    进程内权限目录
+
+    权限表很少变化，启动时加载全部权限，随 RBAC 全局版本失效（PermissionController 写操作或其他进程的失效消息）。
+    超级管理员的权限列表、权限代码解析与无筛选条件的权限列表均直接读取内存。
+    """
+
+    def __init__(self):
+        self._permissions: Optional[list[Permission]] = None
+        self._by_code: dict[str, Permission] = {}
+        # 每次失效时递增，加载期间发生失效的结果不再保存
+        self._generation = 0
+
+    async def load(self) -> list[Permission]:
+        generation = self._generation
+        permissions = await Permission.all().order_by("id")
+        if generation == self._generation:
+            self._permissions = permissions
+            self._by_code = {permission.code: permission for permission in permissions}
+        return permissions
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._permissions = None
+        self._by_code = {}
+
+    async def all(self) -> list[Permission]:
+        """全部权限（按ID排序），返回列表副本"""
+        permissions = self._permissions
+        if permissions is None:
+            permissions = await self.load()
+        return list(permissions)
+
+    async def by_codes(self, codes: Iterable[str]) -> list[Permission]:
+        """按权限代码解析权限，不存在的代码忽略"""
+        by_code = self._by_code
+        if self._permissions is None:
+            by_code = {permission.code: permission for permission in await self.load()}
+        return [by_code[code] for code in dict.fromkeys(codes) if code in by_code]
+
+
+permission_catalog = PermissionCatalog()
@@ -0,0 +1,190 @@
+import base64
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from tortoise.expressions import Q
+
+from models.role import Permission
+
+# 位置为 (字节下标, 位标志)
+Position = tuple[int, int]
+
+# 通配符：resource 为 * 表示所有资源，action 为 * 表示所有操作
+WILDCARD = "*"
+# 操作蕴含规则：拥有某资源的 key 操作即拥有该资源的 value 操作
+IMPLIED_ACTIONS = {"manage": ("create", "read", "update", "delete")}
+
+
+def _position(permission_id: int) -> Position:
+    return permission_id >> 3, 1 << (permission_id & 7)
+
+
+def build_mask(permission_ids: Iterable[int]) -> bytes:
+    """将权限ID集合编码为位掩码，第 id 位表示拥有该权限"""
+    ids = list(permission_ids)
+    if not ids:
+        return b""
+    mask = bytearray(max(ids) // 8 + 1)
+    for permission_id in ids:
+        mask[permission_id >> 3] |= 1 << (permission_id & 7)
+    return bytes(mask)
+
+
+def _permission_id(position: Position) -> int:
+    index, bit = position
+    return index * 8 + bit.bit_length() - 1
+
+
+def encode_mask(mask: bytes) -> str:
+    """位掩码编码为不带填充的 base64url 字符串，用于写入 token"""
+    return base64.urlsafe_b64encode(mask).rstrip(b"=").decode()
+
+
+def decode_mask(encoded: str) -> bytes:
+    return base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4))
+
+
+def has_bit(mask: bytes, position: Optional[Position]) -> bool:
+    if position is None:
+        return False
+    index, bit = position
+    return index < len(mask) and bool(mask[index] & bit)
+
+
+class PermissionRegistry:
+    """
+    权限注册表
+
+    为每个 resource:action 分配稳定的位索引（直接使用权限ID），
+    用户的有效权限编码为字节位掩码，权限检查只需一次下标访问和按位与。
+
+    通配符与蕴含规则（如 user:manage ⇒ user:read、*:read ⇒ 所有资源的 read）在加载时
+    编译为 权限ID → 蕴含的权限ID 表，用户掩码构建时展开，检查时无需逐条匹配规则。
+    """
+
+    def __init__(self):
+        self._positions: dict[tuple[str, str], Optional[Position]] = {}
+        self._implied: dict[int, set[int]] = {}
+        self._loaded = False
+
+    async def load(self) -> None:
+        from core.rbac_snapshot import rbac_snapshot
+
+        # 优先读取本机共享快照中的权限表
+        snapshot = await rbac_snapshot.get()
+        if snapshot is not None:
+            rows = snapshot.permissions()
+        else:
+            rows = await Permission.all().values_list("id", "resource", "action")
+        self._positions = {(resource, action): _position(permission_id) for permission_id, resource, action in rows}
+        self._implied = self._compile_implications(rows)
+        self._loaded = True
+
+    @staticmethod
+    def _compile_implications(rows: list[tuple[int, str, str]]) -> dict[int, set[int]]:
+        """计算每个权限蕴含的其他已存在权限"""
+        by_resource: dict[str, list[tuple[int, str]]] = defaultdict(list)
+        for permission_id, resource, action in rows:
+            by_resource[resource].append((permission_id, action))
+
+        implied = {}
+        for permission_id, resource, action in rows:
+            actions = None if action == WILDCARD else {action, *IMPLIED_ACTIONS.get(action, ())}
+            resources = by_resource.values() if resource == WILDCARD else [by_resource[resource]]
+            ids = {
+                candidate_id
+                for candidates in resources
+                for candidate_id, candidate_action in candidates
+                if actions is None or candidate_action in actions
+            }
+            ids.discard(permission_id)
+            if ids:
+                implied[permission_id] = ids
+        return implied
+
+    def invalidate(self) -> None:
+        """权限增删后调用，下次使用时重新加载"""
+        self._positions = {}
+        self._implied = {}
+        self._loaded = False
+
+    async def expand_ids(self, permission_ids: Iterable[int]) -> set[int]:
+        """将直接授予的权限展开为包含蕴含权限的ID集合"""
+        if not self._loaded:
+            await self.load()
+
+        ids = set(permission_ids)
+        for permission_id in list(ids):
+            ids.update(self._implied.get(permission_id, ()))
+        return ids
+
+    async def expand(self, permission_ids: Iterable[int]) -> bytes:
+        """将直接授予的权限展开为包含蕴含权限的位掩码"""
+        return build_mask(await self.expand_ids(permission_ids))
+
+    async def implying_ids(self, permission_id: int) -> set[int]:
+        """拥有其中任一权限即拥有 permission_id 的权限ID集合（含自身）"""
+        if not self._loaded:
+            await self.load()
+
+        return {permission_id} | {
+            implying_id for implying_id, implied in self._implied.items() if permission_id in implied
+        }
+
+    async def granting_ids(self, resource: str, action: str) -> set[int]:
+        """直接授予其中任一权限即拥有 resource:action 的权限ID集合（含通配与蕴含）"""
+        position = await self.position(resource, action)
+        if position is not None:
+            return await self.implying_ids(_permission_id(position))
+        return {_permission_id(candidate) for candidate in self._wildcard_positions(resource, action)}
+
+    def _wildcard_positions(self, resource: str, action: str) -> list[Position]:
+        """不存在对应权限记录时，可能覆盖该 resource:action 的通配或蕴含权限"""
+        candidates = [(resource, WILDCARD), (WILDCARD, action), (WILDCARD, WILDCARD)]
+        for implying, implied in IMPLIED_ACTIONS.items():
+            if action in implied:
+                candidates += [(resource, implying), (WILDCARD, implying)]
+        return [self._positions[pair] for pair in candidates if self._positions.get(pair)]
+
+    def _match(self, mask: bytes, pair: tuple[str, str], position: Optional[Position]) -> bool:
+        if position is not None:
+            return has_bit(mask, position)
+        return any(has_bit(mask, candidate) for candidate in self._wildcard_positions(*pair))
+
+    async def position(self, resource: str, action: str) -> Optional[Position]:
+        """获取权限在掩码中的位置，权限不存在时返回 None"""
+        if not self._loaded:
+            await self.load()
+
+        pair = (resource, action)
+        if pair not in self._positions:
+            # 可能是其他进程新建的权限，单独查询一次；不存在的权限同样记录，直到注册表随 RBAC 版本失效
+            permission_id = await Permission.filter(resource=resource, action=action).first().values_list("id", flat=True)
+            self._positions[pair] = None if permission_id is None else _position(permission_id)
+        return self._positions[pair]
+
+    async def positions(self, pairs: Iterable[tuple[str, str]]) -> dict[tuple[str, str], Optional[Position]]:
+        """批量获取权限位置，注册表中没有的权限合并为一次查询"""
+        if not self._loaded:
+            await self.load()
+
+        pairs = set(pairs)
+        missing = [pair for pair in pairs if pair not in self._positions]
+        if missing:
+            # 不存在的权限也记录下来，新建权限时注册表会随 RBAC 版本一起失效
+            self._positions.update(dict.fromkeys(missing))
+            query = Q(*[Q(resource=resource, action=action) for resource, action in missing], join_type=Q.OR)
+            for permission_id, resource, action in await Permission.filter(query).values_list("id", "resource", "action"):
+                self._positions[(resource, action)] = _position(permission_id)
+        return {pair: self._positions.get(pair) for pair in pairs}
+
+    async def check(self, mask: bytes, resource: str, action: str) -> bool:
+        """检查掩码是否拥有权限，mask 需由 expand 构建"""
+        return self._match(mask, (resource, action), await self.position(resource, action))
+
+    async def check_many(self, mask: bytes, pairs: Iterable[tuple[str, str]]) -> dict[tuple[str, str], bool]:
+        positions = await self.positions(pairs)
+        return {pair: self._match(mask, pair, position) for pair, position in positions.items()}
+
+
+permission_registry = PermissionRegistry()
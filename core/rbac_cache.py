@@ -0,0 +1,253 @@
+"""
+用户有效权限缓存
+
+Redis 中按用户保存权限位掩码，并记录计算时的全局 RBAC 版本与用户版本：
+- 权限增删改递增全局版本，所有缓存失效；
+- 角色或用户角色变更只递增受影响用户的版本，受影响用户通过角色 → 用户反向索引确定。
+每个进程另有一层内存缓存，由 Redis 发布订阅消息驱动失效。
+
+版本以 "全局版本.用户版本" 的形式写入 access token（JWT_EMBED_PERMISSIONS），
+token 中的权限快照在版本未变化时可直接使用。版本计数器不存在时以毫秒时间戳初始化，
+Redis 数据丢失后重新计数的版本不会与旧 token 中的版本碰撞。
+"""
+
+import asyncio
+import json
+import time
+from typing import Iterable, Optional
+
+from redis.exceptions import RedisError
+
+from config import settings
+from core.cache import TTLCache
+from core.permission_catalog import permission_catalog
+from core.permission_registry import decode_mask, permission_registry
+from core.rbac_snapshot import GRAPH_VERSION_KEY, rbac_snapshot
+from core.redis_manager import redis_manager
+from core.user_permissions import refresh_role_users, refresh_user_permissions
+from models.role import RoleClosure, UserRole
+from models.user import User
+
+RBAC_VERSION_KEY = "rbac:version"
+USER_VERSION_KEY_PREFIX = "rbac:user_version:"
+USER_PERMISSIONS_KEY_PREFIX = "rbac:perms:"
+ROLE_USERS_KEY_PREFIX = "rbac:role_users:"
+INVALIDATE_CHANNEL = "rbac:invalidate"
+
+# 反向索引需覆盖 access token 中权限快照的整个有效期，否则索引过期后撤销授权无法使快照失效
+ROLE_USERS_TTL = max(settings.RBAC_CACHE_TTL, settings.ACCESS_TOKEN_EXPIRE_DAYS * 86400)
+
+# 进程内缓存，键为用户ID，分别保存权限掩码与 "全局版本.用户版本"
+mask_cache = TTLCache(maxsize=settings.PRINCIPAL_CACHE_MAXSIZE, ttl=settings.RBAC_CACHE_L1_TTL)
+version_cache = TTLCache(maxsize=settings.PRINCIPAL_CACHE_MAXSIZE, ttl=settings.RBAC_CACHE_L1_TTL)
+
+# 每次本进程缓存失效时递增，读取 Redis 或数据库期间发生失效的结果不再写入进程内缓存
+_generation = 0
+
+
+def _user_version_key(user_id: int) -> str:
+    return f"{USER_VERSION_KEY_PREFIX}{user_id}"
+
+
+def _user_permissions_key(user_id: int) -> str:
+    return f"{USER_PERMISSIONS_KEY_PREFIX}{user_id}"
+
+
+def _role_users_key(role_id: int) -> str:
+    return f"{ROLE_USERS_KEY_PREFIX}{role_id}"
+
+
+def _format_version(global_version: Optional[str], user_version: Optional[str]) -> str:
+    return f"{int(global_version or 0)}.{int(user_version or 0)}"
+
+
+async def _seed_version(key: str, value: Optional[str]) -> Optional[str]:
+    """版本计数器不存在时以当前毫秒时间戳初始化（与会话纪元相同），返回当前值"""
+    if value is not None:
+        return value
+    await redis_manager.set(key, str(int(time.time() * 1000)), nx=True)
+    return await redis_manager.get(key)
+
+
+async def _incr_version(key: str) -> int:
+    await redis_manager.set(key, str(int(time.time() * 1000)), nx=True)
+    return await redis_manager.incr(key)
+
+
+async def get_user_rbac_version(user_id: int) -> str:
+    """获取用户当前的权限版本，格式为 "全局版本.用户版本" """
+    version = version_cache.get(user_id)
+    if version is None:
+        generation = _generation
+        global_version, user_version = await redis_manager.mget([RBAC_VERSION_KEY, _user_version_key(user_id)])
+        version = _format_version(
+            await _seed_version(RBAC_VERSION_KEY, global_version),
+            await _seed_version(_user_version_key(user_id), user_version),
+        )
+        if generation == _generation:
+            version_cache.set(user_id, version)
+    return version
+
+
+async def get_user_permission_mask(user_id: int, snapshot: Optional[tuple[str, str]] = None) -> bytes:
+    """
+    获取用户有效权限位掩码，依次查询 token 快照、进程内缓存、Redis 与数据库
+
+    Args:
+        user_id: 用户ID
+        snapshot: access token 中的 (权限版本, 编码后的掩码)，版本与当前一致时直接使用
+    """
+    if snapshot is not None:
+        version, encoded = snapshot
+        if version == await get_user_rbac_version(user_id):
+            return decode_mask(encoded)
+
+    mask = mask_cache.get(user_id)
+    if mask is not None:
+        return mask
+
+    # 先读取版本再计算，计算期间发生的变更会使写入的缓存版本过期
+    generation = _generation
+    global_version, user_version, cached = await redis_manager.mget(
+        [RBAC_VERSION_KEY, _user_version_key(user_id), _user_permissions_key(user_id)]
+    )
+    global_version = await _seed_version(RBAC_VERSION_KEY, global_version)
+    user_version = await _seed_version(_user_version_key(user_id), user_version)
+    version = _format_version(global_version, user_version)
+    global_version, user_version = int(global_version or 0), int(user_version or 0)
+    if cached:
+        entry = json.loads(cached)
+        if entry["g"] == global_version and entry["u"] == user_version:
+            mask = bytes.fromhex(entry["mask"])
+            if generation == _generation:
+                mask_cache.set(user_id, mask)
+                version_cache.set(user_id, version)
+            return mask
+
+    snapshot = await rbac_snapshot.get()
+    if snapshot is not None:
+        # 共享快照中已有每个角色展开后的掩码，只需查询用户持有的启用角色
+        assigned = await UserRole.filter(user_id=user_id, is_active=True).values_list("role_id", flat=True)
+        mask = snapshot.user_mask(assigned)
+    else:
+        permission_ids = await User.permission_query(user_id).distinct().values_list("id", flat=True)
+        mask = await permission_registry.expand(permission_ids)
+
+    await index_user_roles(user_id)
+    await redis_manager.set(
+        _user_permissions_key(user_id),
+        json.dumps({"g": global_version, "u": user_version, "mask": mask.hex()}),
+        expire=settings.RBAC_CACHE_TTL,
+    )
+    if generation == _generation:
+        mask_cache.set(user_id, mask)
+        version_cache.set(user_id, version)
+    return mask
+
+
+async def index_user_roles(user_id: int) -> None:
+    """
+    记录用户持有的全部角色及其祖先角色（含已禁用），角色变更时据此定位受影响的用户
+
+    计算权限与签发权限快照时调用，索引保留 ROLE_USERS_TTL。
+    """
+    role_ids = await RoleClosure.filter(descendant__role_users__user_id=user_id).values_list("ancestor_id", flat=True)
+    for role_id in set(role_ids):
+        await redis_manager.sadd(_role_users_key(role_id), user_id)
+        await redis_manager.expire(_role_users_key(role_id), ROLE_USERS_TTL)
+
+
+async def invalidate_users(user_ids: Iterable[int]) -> None:
+    """用户角色变更后调用，使这些用户的权限缓存失效"""
+    user_ids = set(user_ids)
+    await refresh_user_permissions(user_ids)
+    await _invalidate_cached_users(user_ids)
+
+
+async def _invalidate_cached_users(user_ids: set[int]) -> None:
+    if not user_ids:
+        return
+
+    for user_id in user_ids:
+        await _incr_version(_user_version_key(user_id))
+        await redis_manager.delete(_user_permissions_key(user_id))
+    _evict_users(user_ids)
+    await redis_manager.publish(INVALIDATE_CHANNEL, json.dumps({"users": sorted(user_ids)}))
+
+
+async def invalidate_roles(role_ids: Iterable[int]) -> None:
+    """角色或其权限变更后调用，只使持有这些角色的用户失效"""
+    role_ids = set(role_ids)
+    await refresh_role_users(role_ids)
+    await _bump_graph_version()
+
+    user_ids = set()
+    for role_id in role_ids:
+        user_ids.update(int(user_id) for user_id in await redis_manager.smembers(_role_users_key(role_id)))
+    await _invalidate_cached_users(user_ids)
+
+
+async def bump_rbac_version() -> int:
+    """权限定义变更后调用，递增全局版本使所有权限缓存失效"""
+    version = await _incr_version(RBAC_VERSION_KEY)
+    _apply_version_change()
+    await refresh_user_permissions()
+    await _bump_graph_version()
+    await redis_manager.publish(INVALIDATE_CHANNEL, json.dumps({"version": version}))
+    return version
+
+
+async def _bump_graph_version() -> None:
+    """角色、权限或其关联变更后递增图版本，使共享快照过期"""
+    graph_version = await redis_manager.incr(GRAPH_VERSION_KEY)
+    rbac_snapshot.invalidate()
+    await redis_manager.publish(INVALIDATE_CHANNEL, json.dumps({"graph": graph_version}))
+
+
+def _evict_users(user_ids: Iterable[int]) -> None:
+    global _generation
+    _generation += 1
+    for user_id in user_ids:
+        mask_cache.delete(user_id)
+        version_cache.delete(user_id)
+
+
+def _apply_version_change() -> None:
+    global _generation
+    _generation += 1
+    mask_cache.clear()
+    version_cache.clear()
+    permission_registry.invalidate()
+    permission_catalog.invalidate()
+    rbac_snapshot.invalidate()
+
+
+def _handle_message(data: str) -> None:
+    message = json.loads(data)
+    if "version" in message:
+        _apply_version_change()
+    if "graph" in message:
+        rbac_snapshot.invalidate()
+    _evict_users(message.get("users", []))
+
+
+async def listen_invalidations() -> None:
+    """订阅失效消息，进程启动时作为后台任务运行；连接中断期间可能丢失消息，重连后清空本地缓存"""
+    while True:
+        pubsub = None
+        try:
+            pubsub = await redis_manager.pubsub()
+            await pubsub.subscribe(INVALIDATE_CHANNEL)
+            _apply_version_change()
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    _handle_message(message["data"])
+        except RedisError:
+            await asyncio.sleep(1)
+        finally:
+            if pubsub is not None:
+                await pubsub.aclose()
+
+
+def start_invalidation_listener() -> asyncio.Task:
+    return asyncio.create_task(listen_invalidations())
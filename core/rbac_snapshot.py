@@ -0,0 +1,190 @@
+"""
+RBAC 共享快照
+
+将角色 → 有效权限（已按继承闭包、启用状态与通配/蕴含规则展开）编译为定长位掩码数组，
+写入本机文件（建议位于 /dev/shm）后由各 worker 以 mmap 只读映射，同一主机上的 N 个进程共用一份数据。
+
+文件布局（本机字节序）：
+    头部     magic(4s) 格式版本(I) 图版本(Q) 权限数(I) 角色数(I) 掩码字节数(I)
+    权限ID   I × 权限数
+    角色ID   I × 角色数（升序）
+    角色掩码 掩码字节数 × 角色数
+    权限元数据长度(I) + JSON [[resource, action], ...]，与权限ID一一对应
+
+角色、权限或其关联变更时递增图版本（rbac:graph_version），首个发现快照过期的 worker
+在 Redis 锁保护下重建并原子替换文件，其他 worker 期间回退到数据库查询。
+"""
+
+import bisect
+import json
+import mmap
+import os
+import struct
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from config import settings
+from core.permission_registry import PermissionRegistry, build_mask
+from core.redis_manager import redis_manager
+from models.role import Permission, Role, RoleClosure
+
+GRAPH_VERSION_KEY = "rbac:graph_version"
+SNAPSHOT_LOCK_KEY = "rbac:snapshot:lock"
+
+MAGIC = b"RBAC"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("=4sIQIII")
+LENGTH = struct.Struct("=I")
+
+
+class RBACSnapshot:
+    """只读映射的快照文件，角色掩码以 memoryview 切片访问，不复制数据"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        magic, format_version, self.version, permission_count, role_count, self.mask_len = HEADER.unpack_from(view)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            view.release()
+            self._mmap.close()
+            raise ValueError("RBAC 快照文件格式不匹配")
+
+        offset = HEADER.size
+        self._permission_ids = view[offset:offset + 4 * permission_count].cast("I")
+        offset += 4 * permission_count
+        self._role_ids = view[offset:offset + 4 * role_count].cast("I")
+        offset += 4 * role_count
+        self._masks = view[offset:offset + self.mask_len * role_count]
+        offset += self.mask_len * role_count
+        (meta_len,) = LENGTH.unpack_from(view, offset)
+        self._meta = view[offset + LENGTH.size:offset + LENGTH.size + meta_len]
+        self._view = view
+
+    def permissions(self) -> list[tuple[int, str, str]]:
+        """权限 (id, resource, action) 列表"""
+        meta = json.loads(bytes(self._meta))
+        return [(permission_id, resource, action) for permission_id, (resource, action) in zip(self._permission_ids, meta)]
+
+    def role_mask(self, role_id: int) -> Optional[memoryview]:
+        index = bisect.bisect_left(self._role_ids, role_id)
+        if index == len(self._role_ids) or self._role_ids[index] != role_id:
+            return None
+        return self._masks[index * self.mask_len:(index + 1) * self.mask_len]
+
+    def user_mask(self, role_ids: Iterable[int]) -> bytes:
+        """合并用户持有角色的掩码，结果与 build_mask 的编码一致"""
+        combined = 0
+        for role_id in role_ids:
+            mask = self.role_mask(role_id)
+            if mask is not None:
+                combined |= int.from_bytes(mask, "little")
+        return combined.to_bytes(self.mask_len, "little").rstrip(b"\x00")
+
+    def close(self) -> None:
+        for view in (self._permission_ids, self._role_ids, self._masks, self._meta, self._view):
+            view.release()
+        self._mmap.close()
+
+
+async def build_snapshot(version: int) -> bytes:
+    """从数据库编译快照内容"""
+    permissions = sorted(await Permission.all().values_list("id", "resource", "action"))
+    roles = dict(await Role.all().values_list("id", "is_active"))
+
+    granted = defaultdict(set)
+    for role_id, permission_id in await Role.filter(
+        is_active=True, permissions__id__isnull=False
+    ).values_list("id", "permissions__id"):
+        granted[role_id].add(permission_id)
+    ancestors = defaultdict(list)
+    for descendant_id, ancestor_id in await RoleClosure.all().values_list("descendant_id", "ancestor_id"):
+        ancestors[descendant_id].append(ancestor_id)
+
+    implied = PermissionRegistry._compile_implications(permissions)
+    mask_len = permissions[-1][0] // 8 + 1 if permissions else 0
+    role_ids = sorted(roles)
+    masks = bytearray()
+    for role_id in role_ids:
+        ids = set()
+        if roles[role_id]:
+            for ancestor_id in ancestors[role_id] or [role_id]:
+                ids.update(granted[ancestor_id])
+            for permission_id in list(ids):
+                ids.update(implied.get(permission_id, ()))
+        masks += build_mask(ids).ljust(mask_len, b"\x00")
+
+    meta = json.dumps([[resource, action] for _, resource, action in permissions]).encode()
+    return b"".join([
+        HEADER.pack(MAGIC, FORMAT_VERSION, version, len(permissions), len(role_ids), mask_len),
+        struct.pack(f"={len(permissions)}I", *(permission_id for permission_id, _, _ in permissions)),
+        struct.pack(f"={len(role_ids)}I", *role_ids),
+        bytes(masks),
+        LENGTH.pack(len(meta)),
+        meta,
+    ])
+
+
+class SnapshotManager:
+    """进程内的快照句柄，按图版本决定继续使用、重新映射或重建"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._snapshot: Optional[RBACSnapshot] = None
+        self._version: Optional[int] = None
+
+    async def current_version(self) -> int:
+        if self._version is None:
+            self._version = int(await redis_manager.get(GRAPH_VERSION_KEY) or 0)
+        return self._version
+
+    def invalidate(self) -> None:
+        """收到图版本变更消息时调用，下次使用时重新确认版本"""
+        self._version = None
+
+    async def get(self) -> Optional[RBACSnapshot]:
+        """返回与当前图版本一致的快照，快照不可用时返回 None，由调用方回退到数据库"""
+        if not self.path:
+            return None
+
+        version = await self.current_version()
+        if self._snapshot is not None and self._snapshot.version == version:
+            return self._snapshot
+
+        snapshot = self._open()
+        if snapshot is None or snapshot.version != version:
+            if snapshot is not None:
+                snapshot.close()
+            snapshot = None
+            if await redis_manager.set(SNAPSHOT_LOCK_KEY, "1", expire=30, nx=True):
+                try:
+                    await self.publish(version)
+                except OSError:
+                    return None
+                finally:
+                    await redis_manager.delete(SNAPSHOT_LOCK_KEY)
+                snapshot = self._open()
+            if snapshot is None or snapshot.version != version:
+                return None
+
+        if self._snapshot is not None:
+            self._snapshot.close()
+        self._snapshot = snapshot
+        return snapshot
+
+    async def publish(self, version: int) -> None:
+        """重建快照并原子替换文件，已映射旧文件的进程不受影响"""
+        content = await build_snapshot(version)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, self.path)
+
+    def _open(self) -> Optional[RBACSnapshot]:
+        try:
+            return RBACSnapshot(self.path)
+        except (OSError, ValueError, struct.error):
+            return None
+
+
+rbac_snapshot = SnapshotManager(settings.RBAC_SNAPSHOT_PATH)
@@ -1,6 +1,8 @@
+import hashlib
 import json
 from typing import Optional
 import redis.asyncio as redis
+from redis.exceptions import NoScriptError
 
 from config import settings
 
@@ -33,14 +35,43 @@ class RedisManager:
         await self.init_redis()
         return await self._redis.get(key)
 
-    async def set(self, key: str, value: str, expire: int = None):
+    async def set(self, key: str, value: str, expire: int = None, nx: bool = False):
         await self.init_redis()
-        await self._redis.set(key, value, ex=expire)
+        return await self._redis.set(key, value, ex=expire, nx=nx)
 
     async def delete(self, key: str):
         await self.init_redis()
         await self._redis.delete(key)
 
+    async def mget(self, keys: list[str]) -> list[Optional[str]]:
+        await self.init_redis()
+        return await self._redis.mget(keys)
+
+    async def sadd(self, key: str, *values):
+        await self.init_redis()
+        return await self._redis.sadd(key, *values)
+
+    async def smembers(self, key: str):
+        await self.init_redis()
+        return await self._redis.smembers(key)
+
+    async def incr(self, key: str, amount: int = 1) -> int:
+        await self.init_redis()
+        return await self._redis.incr(key, amount)
+
+    async def expire(self, key: str, seconds: int):
+        await self.init_redis()
+        return await self._redis.expire(key, seconds)
+
+    async def eval_script(self, script: str, keys: list[str], args: list):
+        """执行 Lua 脚本，优先使用 EVALSHA，脚本未缓存时回退到 EVAL"""
+        await self.init_redis()
+        sha = hashlib.sha1(script.encode()).hexdigest()
+        try:
+            return await self._redis.evalsha(sha, len(keys), *keys, *args)
+        except NoScriptError:
+            return await self._redis.eval(script, len(keys), *keys, *args)
+
     async def rpush(self, key: str, value: list[dict]):
         await self.init_redis()
         for obj in value:
@@ -0,0 +1,151 @@
+"""
+行级策略编译
+
+将 RowPolicy 的 JSON 条件编译为 Tortoise Q 表达式，作为 base_query 注入 CRUDBase.list / get，
+记录在数据库中过滤。策略只约束其所在角色（及后代角色）授予的权限，不影响其他角色的授权。编译结果按 (用户, 权限版本, 用户更新时间, resource, action) 缓存。
+"""
+
+import re
+from collections import defaultdict
+from typing import Any, Optional, Type
+
+from tortoise.expressions import Q
+from tortoise.models import Model
+from tortoise.queryset import QuerySet
+
+from config import settings
+from core.cache import TTLCache
+from core.permission_registry import permission_registry
+from core.rbac_cache import get_user_rbac_version
+from models.operation_log import OperationLog
+from models.policy import RowPolicy
+from models.role import Role, RoleClosure
+from models.user import User
+
+# 条件值中的用户属性占位符，如 ${user.id}
+PLACEHOLDER = re.compile(r"^\$\{user\.(\w+)\}$")
+ALLOWED_LOOKUPS = {
+    "not", "in", "not_in", "gte", "gt", "lte", "lt", "isnull", "not_isnull",
+    "contains", "icontains", "startswith", "istartswith", "endswith", "iendswith", "iexact",
+}
+
+# 支持行级策略的资源及其模型，用于创建策略时校验条件
+POLICY_RESOURCES: dict[str, Type[Model]] = {
+    "operation_log": OperationLog,
+    "user": User,
+}
+# 各资源已通过 utils.rbac.get_row_scope 接入行级策略的操作，其他操作的策略不会生效，创建时拒绝
+POLICY_ACTIONS: dict[str, set[str]] = {
+    "operation_log": {"read"},
+    "user": {"read", "manage"},
+}
+
+policy_cache = TTLCache(maxsize=settings.PRINCIPAL_CACHE_MAXSIZE, ttl=settings.RBAC_CACHE_L1_TTL)
+
+
+def _resolve_value(value: Any, user: User) -> Any:
+    if isinstance(value, list):
+        return [_resolve_value(item, user) for item in value]
+    if isinstance(value, str):
+        match = PLACEHOLDER.match(value)
+        if match:
+            attribute = match.group(1)
+            if attribute not in User._meta.fields_map:
+                raise ValueError(f"未知的用户属性: {attribute}")
+            return getattr(user, attribute)
+    return value
+
+
+def compile_condition(model: Type[Model], condition: dict, user: User) -> Q:
+    """
+    将 JSON 条件编译为 Q 表达式
+
+    Raises:
+        ValueError: 条件引用了模型不存在的字段、不支持的查询后缀或未知的用户属性
+    """
+    if not isinstance(condition, dict) or not condition:
+        raise ValueError("策略条件必须是非空对象")
+
+    parts = []
+    for key, value in condition.items():
+        if key in ("and", "or"):
+            if not isinstance(value, list) or not value:
+                raise ValueError(f"{key} 需要非空条件列表")
+            parts.append(Q(*[compile_condition(model, item, user) for item in value], join_type=key.upper()))
+        elif key == "not":
+            parts.append(~compile_condition(model, value, user))
+        else:
+            field, _, lookup = key.partition("__")
+            if field not in model._meta.fields_map:
+                raise ValueError(f"{model.__name__} 没有字段: {field}")
+            if lookup and lookup not in ALLOWED_LOOKUPS:
+                raise ValueError(f"不支持的查询条件: {lookup}")
+            parts.append(Q(**{key: _resolve_value(value, user)}))
+    return parts[0] if len(parts) == 1 else Q(*parts, join_type=Q.AND)
+
+
+async def policy_filter(user: User, resource: str, action: str, model: Type[Model]) -> Optional[Q]:
+    """
+    用户访问 resource:action 时的行过滤条件，超级管理员或存在不受限制的授权时返回 None
+
+    策略约束的是持有该策略角色（或其后代角色）所授予的权限：用户每个授予该权限的已分配角色，
+    以其自身及祖先角色上的策略之间的 OR 作为范围，没有策略则不受限制；各角色的范围再取 OR。
+    不授予该权限的角色上的策略不影响结果。
+    """
+    if user.is_superuser:
+        return None
+
+    key = (user.id, await get_user_rbac_version(user.id), user.updated_at, resource, action, model.__name__)
+    cached = policy_cache.get(key)
+    if cached is not None:
+        return cached[0]
+
+    # 用户启用的已分配角色 → 启用的祖先角色（含自身）
+    links = await RoleClosure.filter(
+        ancestor__is_active=True,
+        descendant__is_active=True,
+        descendant__role_users__is_active=True,
+        descendant__role_users__user_id=user.id,
+    ).values_list("descendant_id", "ancestor_id")
+    chains: dict[int, set[int]] = defaultdict(set)
+    for role_id, ancestor_id in links:
+        chains[role_id].add(ancestor_id)
+    ancestor_ids = {ancestor_id for _, ancestor_id in links}
+
+    permission_ids = await permission_registry.granting_ids(resource, action)
+    granting = set()
+    conditions: dict[int, list[dict]] = defaultdict(list)
+    if ancestor_ids and permission_ids:
+        granting = set(await Role.filter(
+            id__in=ancestor_ids, permissions__id__in=permission_ids
+        ).distinct().values_list("id", flat=True))
+        for role_id, condition in await RowPolicy.filter(
+            resource=resource, action=action, role_id__in=ancestor_ids
+        ).values_list("role_id", "condition"):
+            conditions[role_id].append(condition)
+
+    scopes = []
+    for ancestors in chains.values():
+        if not ancestors & granting:
+            continue
+        role_conditions = [condition for ancestor_id in ancestors for condition in conditions[ancestor_id]]
+        if not role_conditions:
+            # 存在不受策略限制的授权
+            policy_cache.set(key, (None,))
+            return None
+        scopes.extend(role_conditions)
+
+    # 没有角色授予该权限时（如权限刚被撤销）不返回任何记录
+    q = (
+        Q(*[compile_condition(model, condition, user) for condition in scopes], join_type=Q.OR)
+        if scopes
+        else Q(id__in=[])
+    )
+    policy_cache.set(key, (q,))
+    return q
+
+
+async def scoped_query(user: User, resource: str, action: str, model: Type[Model]) -> QuerySet:
+    """应用行级策略后的查询集"""
+    q = await policy_filter(user, resource, action, model)
+    return model.filter(q) if q is not None else model.all()
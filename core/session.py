@@ -0,0 +1,98 @@
+import time
+from typing import Optional
+
+from fastapi import HTTPException, status
+from tortoise.exceptions import IntegrityError
+
+from config import settings
+from core.cache import TTLCache
+from core.redis_manager import redis_manager
+from models.user import User, UserSession
+from schemas.auth import JWTDecoder
+
+SESSION_EPOCH_KEY_PREFIX = "auth:session_epoch:"
+# 纪元键的有效期与刷新 token 一致，过期后签发的 token 也已全部失效
+SESSION_EPOCH_EXPIRE = settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600
+
+# 会话纪元的进程内短期缓存，键为用户ID
+epoch_cache = TTLCache(maxsize=settings.PRINCIPAL_CACHE_MAXSIZE, ttl=settings.SESSION_EPOCH_L1_TTL)
+
+
+def _epoch_key(user_id: int) -> str:
+    return f"{SESSION_EPOCH_KEY_PREFIX}{user_id}"
+
+
+async def get_session_epoch(user_id: int) -> Optional[int]:
+    """获取用户当前的会话纪元，Redis 中不存在时返回 None"""
+    epoch = epoch_cache.get(user_id)
+    if epoch is not None:
+        return epoch
+
+    value = await redis_manager.get(_epoch_key(user_id))
+    if value is None:
+        return None
+    epoch = int(value)
+    epoch_cache.set(user_id, epoch)
+    return epoch
+
+
+async def bump_session_epoch(user_id: int) -> int:
+    """
+    递增用户的会话纪元，使此前签发的所有 token 失效
+
+    纪元不存在时先以当前毫秒时间戳初始化，避免 Redis 数据丢失后
+    重新计数的纪元与旧 token 中的值碰撞。
+    """
+    key = _epoch_key(user_id)
+    await redis_manager.set(key, str(int(time.time() * 1000)), nx=True)
+    epoch = await redis_manager.incr(key)
+    await redis_manager.expire(key, SESSION_EPOCH_EXPIRE)
+    await _persist_epoch(user_id, epoch)
+    epoch_cache.set(user_id, epoch)
+    return epoch
+
+
+async def _persist_epoch(user_id: int, epoch: int) -> None:
+    """纪元写入数据库，只增不减，并发递增时保留最大值"""
+    if await UserSession.filter(user_id=user_id, epoch__lt=epoch).update(epoch=epoch):
+        return
+    try:
+        await UserSession.create(user_id=user_id, epoch=epoch)
+    except IntegrityError:
+        # 记录已存在：可能已是更大的纪元，也可能是并发创建的较小纪元
+        await UserSession.filter(user_id=user_id, epoch__lt=epoch).update(epoch=epoch)
+
+
+async def verify_session_epoch(payload: JWTDecoder) -> None:
+    """
+    校验 token 中的会话纪元是否为最新
+
+    只有 Redis 中缺少纪元时才查询数据库：与数据库中记录的纪元比较，
+    没有记录（纪元上线前签发的 token）时按旧规则比较登录时间；通过后重新初始化 Redis 中的纪元。
+    """
+    invalidated_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Token has been invalidated, please login again",
+        headers={"WWW-Authenticate": "Bearer"}
+    )
+
+    epoch = await get_session_epoch(payload.user_id)
+    if epoch is not None:
+        if epoch != payload.session_epoch:
+            raise invalidated_exception
+        return
+
+    session = await UserSession.filter(user_id=payload.user_id).first()
+    if session is not None:
+        if session.epoch != payload.session_epoch:
+            raise invalidated_exception
+    else:
+        user = await User.filter(id=payload.user_id).first()
+        if not user:
+            raise invalidated_exception
+        if user.last_login and payload.login_time != int(user.last_login.timestamp()):
+            raise invalidated_exception
+
+    await redis_manager.set(
+        _epoch_key(payload.user_id), str(payload.session_epoch), expire=SESSION_EPOCH_EXPIRE, nx=True
+    )
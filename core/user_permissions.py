@@ -0,0 +1,70 @@
+"""
+用户有效权限物化表的维护
+
+权限缓存失效的同时刷新受影响用户的物化记录，计算按角色批量进行，查询次数与用户数无关。
+"""
+
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from tortoise.transactions import in_transaction
+
+from config import settings
+from core.permission_registry import permission_registry
+from models.role import RoleClosure, UserPermission, UserRole
+
+
+async def _effective_permissions(user_ids: Optional[set[int]]) -> dict[int, set[int]]:
+    query = UserRole.filter(is_active=True, role__is_active=True)
+    if user_ids is not None:
+        query = query.filter(user_id__in=user_ids)
+    assignments = await query.values_list("user_id", "role_id")
+
+    # 每个角色经启用的祖先角色获得的权限，展开通配与蕴含规则
+    granted = defaultdict(set)
+    for role_id, permission_id in await RoleClosure.filter(
+        descendant_id__in={role_id for _, role_id in assignments},
+        ancestor__is_active=True,
+        ancestor__permissions__id__isnull=False,
+    ).values_list("descendant_id", "ancestor__permissions__id"):
+        granted[role_id].add(permission_id)
+    role_permissions = {role_id: await permission_registry.expand_ids(ids) for role_id, ids in granted.items()}
+
+    effective = defaultdict(set)
+    for user_id, role_id in assignments:
+        effective[user_id].update(role_permissions.get(role_id, ()))
+    return effective
+
+
+async def refresh_user_permissions(user_ids: Optional[Iterable[int]] = None) -> None:
+    """重新计算指定用户的物化权限，user_ids 为 None 时重建全表"""
+    if not settings.RBAC_MATERIALIZE_USER_PERMISSIONS:
+        return
+
+    user_ids = None if user_ids is None else set(user_ids)
+    if user_ids is not None and not user_ids:
+        return
+
+    effective = await _effective_permissions(user_ids)
+    rows = [
+        UserPermission(user_id=user_id, permission_id=permission_id)
+        for user_id, permission_ids in effective.items()
+        for permission_id in permission_ids
+    ]
+    async with in_transaction():
+        if user_ids is None:
+            await UserPermission.all().delete()
+        else:
+            await UserPermission.filter(user_id__in=user_ids).delete()
+        await UserPermission.bulk_create(rows, batch_size=1000)
+
+
+async def refresh_role_users(role_ids: Iterable[int]) -> None:
+    """角色变更后刷新持有该角色或其后代角色的用户"""
+    if not settings.RBAC_MATERIALIZE_USER_PERMISSIONS:
+        return
+
+    user_ids = await UserRole.filter(role__ancestor_links__ancestor_id__in=set(role_ids)).values_list(
+        "user_id", flat=True
+    )
+    await refresh_user_permissions(user_ids)
@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 from tortoise.contrib.fastapi import register_tortoise
@@ -5,10 +7,28 @@ from tortoise.contrib.fastapi import register_tortoise
 from api import api_router
 
 from config import settings
+from controllers.role import role_controller
+from core.permission_catalog import permission_catalog
+from core.rbac_cache import start_invalidation_listener
+from utils.password import password_hasher
+from utils.response import SchemaJSONResponse
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await role_controller.ensure_closure()
+    await permission_catalog.load()
+    listener = start_invalidation_listener()
+    yield
+    listener.cancel()
+    password_hasher.shutdown()
+
 
 app = FastAPI(
     title=settings.APP_NAME,
-    version=settings.VERSION
+    version=settings.VERSION,
+    lifespan=lifespan,
+    default_response_class=SchemaJSONResponse,
 )
 
 app.add_middleware(
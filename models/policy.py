@@ -0,0 +1,23 @@
+from tortoise import fields
+
+from models._base import AbstractBaseModel
+
+
+class RowPolicy(AbstractBaseModel):
+    """
+    行级策略：拥有该角色（或其后代角色）的用户访问 resource:action 时只能看到满足 condition 的记录
+
+    condition 为 JSON 条件，如 {"module": "user"}、{"user_id": "${user.id}"}，
+    支持 Tortoise 查询后缀（__in、__gte 等）以及 and / or / not 组合，由 core.row_policy 编译为 Q 表达式。
+    策略只约束该角色（及其后代角色）授予的权限：同一角色链上的多条策略之间为 OR 关系，
+    用户经其他不带策略的角色获得同一权限时不受限制。
+    """
+    role = fields.ForeignKeyField("models.Role", related_name="row_policies", description="角色")
+    resource = fields.CharField(max_length=100, description="资源名称")
+    action = fields.CharField(max_length=50, description="操作类型")
+    condition = fields.JSONField(description="过滤条件")
+    description = fields.CharField(max_length=255, blank=True, null=True, description="策略描述")
+
+    class Meta:
+        table = "row_policies"
+        indexes = [("resource", "action")]
@@ -41,6 +41,32 @@ class Role(AbstractBaseModel):
         return self.name
 
 
+class RoleInheritance(AbstractBaseModel):
+    """角色继承关系：子角色继承父角色的全部权限"""
+    parent = fields.ForeignKeyField("models.Role", related_name="child_links", description="父角色")
+    child = fields.ForeignKeyField("models.Role", related_name="parent_links", description="子角色")
+
+    class Meta:
+        table = "role_inheritance"
+        unique_together = [("parent", "child")]
+
+
+class RoleClosure(AbstractBaseModel):
+    """
+    角色继承关系的传递闭包，每个角色有一条 depth 为 0 的自身记录
+
+    由 RoleController 随继承关系变更维护，有效权限查询通过 descendant → ancestor 一次关联得到所有祖先角色。
+    """
+    ancestor = fields.ForeignKeyField("models.Role", related_name="descendant_links", description="祖先角色")
+    descendant = fields.ForeignKeyField("models.Role", related_name="ancestor_links", description="后代角色")
+    depth = fields.IntField(default=0, description="继承层级，自身为 0")
+
+    class Meta:
+        table = "role_closure"
+        unique_together = [("ancestor", "descendant")]
+        indexes = [("descendant", "ancestor")]
+
+
 class UserRole(AbstractBaseModel):
     """用户角色关联模型"""
     user = fields.ForeignKeyField("models.User", related_name="user_roles", description="用户")
@@ -52,4 +78,19 @@ class UserRole(AbstractBaseModel):
         unique_together = [("user", "role")]
 
     def __str__(self):
-        return f"{self.user.username} - {self.role.name}"
\ No newline at end of file
+        return f"{self.user.username} - {self.role.name}"
+
+
+class UserPermission(AbstractBaseModel):
+    """
+    用户有效权限物化表（RBAC_MATERIALIZE_USER_PERMISSIONS 开启时维护）
+
+    包含继承与蕴含得到的权限，用于按权限反查用户。
+    """
+    user = fields.ForeignKeyField("models.User", related_name="effective_permissions", description="用户")
+    permission = fields.ForeignKeyField("models.Permission", related_name="effective_users", description="权限")
+
+    class Meta:
+        table = "user_permissions"
+        unique_together = [("user", "permission")]
+        indexes = [("permission", "user")]
\ No newline at end of file
@@ -20,34 +20,92 @@ class User(AbstractBaseModel):
     def __str__(self):
         return self.username
 
+    @staticmethod
+    def permission_query(user_id: int):
+        """
+        用户通过启用的角色及其祖先角色获得的权限查询
+
+        user_roles → role_closure → role_permissions → permissions 单次关联，与继承层级深度无关
+        """
+        from models.role import Permission
+        return Permission.filter(
+            roles__is_active=True,
+            roles__descendant_links__descendant__is_active=True,
+            roles__descendant_links__descendant__role_users__is_active=True,
+            roles__descendant_links__descendant__role_users__user_id=user_id,
+        )
+
+    def _permission_query(self):
+        return User.permission_query(self.id)
+
     async def get_permissions(self):
-        """获取用户所有权限"""
-        if self.is_superuser:
-            from models.role import Permission
-            return await Permission.all()
-        
-        permissions = []
-        user_roles = await self.user_roles.filter(is_active=True).prefetch_related('role__permissions')
-        for user_role in user_roles:
-            if user_role.role.is_active:
-                role_permissions = await user_role.role.permissions.all()
-                permissions.extend(role_permissions)
-        
-        # 去重
-        return list({perm.id: perm for perm in permissions}.values())
+        """获取用户所有权限，在当前实例上只加载一次"""
+        permissions = self.__dict__.get("_permissions")
+        if permissions is None:
+            if self.is_superuser:
+                from core.permission_catalog import permission_catalog
+                permissions = await permission_catalog.all()
+            else:
+                permissions = await self._permission_query().distinct()
+            self._permissions = permissions
+        return permissions
+
+    async def get_roles(self):
+        """获取用户所有启用的角色（含继承的祖先角色），在当前实例上只加载一次"""
+        roles = self.__dict__.get("_roles")
+        if roles is None:
+            from models.role import Role
+            roles = self._roles = await Role.filter(
+                is_active=True,
+                descendant_links__descendant__is_active=True,
+                descendant_links__descendant__role_users__is_active=True,
+                descendant_links__descendant__role_users__user_id=self.id,
+            ).distinct()
+        return roles
+
+    async def get_permission_mask(self) -> bytes:
+        """获取用户有效权限的位掩码，优先读取权限缓存，在当前实例上只计算一次"""
+        mask = self.__dict__.get("_permission_mask")
+        if mask is None:
+            from core.permission_registry import permission_registry
+            permissions = self.__dict__.get("_permissions")
+            if permissions is not None:
+                mask = await permission_registry.expand(permission.id for permission in permissions)
+            else:
+                from core.rbac_cache import get_user_permission_mask
+                mask = await get_user_permission_mask(self.id, self.__dict__.get("_token_snapshot"))
+            self._permission_mask = mask
+        return mask
 
     async def has_permission(self, resource: str, action: str) -> bool:
         """检查用户是否有指定权限"""
         if self.is_superuser:
             return True
-        
-        permissions = await self.get_permissions()
-        return any(perm.resource == resource and perm.action == action for perm in permissions)
+
+        from core.permission_registry import permission_registry
+        return await permission_registry.check(await self.get_permission_mask(), resource, action)
 
     async def has_role(self, role_code: str) -> bool:
         """检查用户是否有指定角色"""
+        return await self.has_any_role([role_code])
+
+    async def has_any_role(self, role_codes: list[str]) -> bool:
+        """检查用户是否有指定角色之一"""
         if self.is_superuser:
             return True
-        
-        user_roles = await self.user_roles.filter(is_active=True).prefetch_related('role')
-        return any(user_role.role.code == role_code and user_role.role.is_active for user_role in user_roles)
+
+        return any(role.code in role_codes for role in await self.get_roles())
+
+
+class UserSession(AbstractBaseModel):
+    """
+    用户当前的会话纪元
+
+    与 Redis 中的纪元同步写入（只增不减），Redis 中纪元丢失时据此校验 token，
+    避免已退出或已轮换的 token 通过旧的登录时间规则重新生效。
+    """
+    user = fields.OneToOneField("models.User", related_name="session", description="用户")
+    epoch = fields.BigIntField(description="会话纪元")
+
+    class Meta:
+        table = "user_sessions"
@@ -22,11 +22,16 @@ class JWTPayload(BaseModel):
     username: str
     is_superuser: bool
     login_time: int
+    session_epoch: int = 0
+    # 可选的权限快照（JWT_EMBED_PERMISSIONS）：base64url 编码的权限位掩码及其对应的权限版本
+    perms: Optional[str] = None
+    rbac_ver: Optional[str] = None
 
 
 class JWTDecoder(JWTPayload):
     type: str
     exp: int
+    jti: Optional[str] = None
 
 class Token(BaseModel):
     access_token: str
@@ -1,8 +1,11 @@
 import ast
+import base64
+import binascii
+import json
 from datetime import datetime
-from typing import Optional, TypeVar, Dict, Any
+from typing import Literal, Optional, Type, TypeVar, Dict, Any
 
-from fastapi import Request, Query
+from fastapi import HTTPException, Request, Query
 from pydantic import BaseModel, field_validator
 from tortoise import fields
 from tortoise.expressions import Q
@@ -19,6 +22,15 @@ class QueryParams(BaseModel):
         None, description="排序字段，格式: field1,-field2 表示field1升序，field2降序"
     )
     search: Optional[str] = Query(None, description="搜索关键词")
+    cursor: Optional[str] = Query(
+        None, description="游标分页：传空字符串获取第一页，之后传响应中的 next_cursor / prev_cursor"
+    )
+    count: Literal["exact", "estimated", "none"] = Query(
+        "exact", description="总数计算方式：exact 精确计数，estimated 估算（大表推荐），none 不计数"
+    )
+    fields: Optional[str] = Query(
+        None, description="只返回指定字段，格式: id,name；不传返回全部字段"
+    )
 
     filters: Dict[str, Any] = {}
 
@@ -29,7 +41,7 @@ class QueryParams(BaseModel):
         data = info.data
 
         # 排除已知字段
-        known_fields = {"page", "page_size", "sort", "search"}
+        known_fields = {"page", "page_size", "sort", "search", "cursor", "count", "fields"}
 
         # 提取过滤参数
         return {k: v for k, v in data.items() if k not in known_fields}
@@ -41,6 +53,9 @@ def get_list_params(
     page_size: int = Query(10, ge=1, le=100),
     sort: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None),
+    count: Literal["exact", "estimated", "none"] = Query("exact"),
+    fields: Optional[str] = Query(None),
 ) -> QueryParams:
     # 提取所有查询参数
     params = dict(request.query_params)
@@ -50,6 +65,9 @@ def get_list_params(
         "page_size": page_size,
         "sort": sort,
         "search": search,
+        "cursor": cursor,
+        "count": count,
+        "fields": fields,
     }
 
     # 过滤参数
@@ -60,6 +78,9 @@ def get_list_params(
         page_size=page_size,
         sort=sort,
         search=search,
+        cursor=cursor,
+        count=count,
+        fields=fields,
         filters=filter_params,
     )
 
@@ -88,12 +109,104 @@ class QueryBuilder:
         offset = (page - 1) * page_size
         return query.offset(offset).limit(page_size)
 
+    @staticmethod
+    def select_fields(model: ModelType, response_model: Type[BaseModel], fields: Optional[str]) -> Optional[list[str]]:
+        """
+        解析 fields 参数，返回需要查询的列（始终包含 id）；未指定时返回 None
+
+        只保留响应模型与数据表共有的字段，关联字段、计算字段忽略
+        """
+        if not fields:
+            return None
+        columns = ["id"]
+        for name in fields.split(","):
+            name = name.strip()
+            if name in response_model.model_fields and name in model._meta.fields_db_projection and name not in columns:
+                columns.append(name)
+        return columns
+
+    @staticmethod
+    def cursor_keys(model: ModelType, sort: Optional[str]) -> list[tuple[str, bool]]:
+        """
+        游标分页的排序键 [(字段, 是否降序)]，末尾追加 id 保证顺序唯一
+
+        只支持模型自身的非空字段（关联字段和可空字段无法构造简单的比较条件），其余字段忽略
+        """
+        keys = []
+        for field in (sort or "").split(","):
+            field = field.strip()
+            name = field.lstrip("-")
+            field_obj = model._meta.fields_map.get(name)
+            if field_obj is None or hasattr(field_obj, "related_model") or field_obj.null:
+                continue
+            if name not in (key for key, _ in keys):
+                keys.append((name, field.startswith("-")))
+        if "id" not in (key for key, _ in keys):
+            keys.append(("id", keys[-1][1] if keys else False))
+        return keys
+
+    @staticmethod
+    def encode_cursor(item, keys: list[tuple[str, bool]], direction: str) -> str:
+        """由记录（模型实例或 values() 字典）的排序键值生成不透明游标，direction 为 next / prev"""
+        values = []
+        for name, _ in keys:
+            value = item[name] if isinstance(item, dict) else getattr(item, name)
+            values.append(value.isoformat() if isinstance(value, datetime) else value)
+        payload = json.dumps({"k": [name for name, _ in keys], "v": values, "d": direction}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).rstrip(b"=").decode()
+
+    @staticmethod
+    def decode_cursor(model: ModelType, cursor: str, keys: list[tuple[str, bool]]) -> tuple[list, str]:
+        """解析游标，返回 (排序键值, 方向)；游标与当前排序不一致时视为无效"""
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+            if payload["k"] != [name for name, _ in keys] or payload["d"] not in ("next", "prev"):
+                raise ValueError
+            values = [
+                QueryBuilder._cursor_value(model._meta.fields_map[name], value)
+                for (name, _), value in zip(keys, payload["v"], strict=True)
+            ]
+        except (ValueError, TypeError, KeyError, binascii.Error):
+            raise HTTPException(status_code=400, detail="无效的分页游标")
+        return values, payload["d"]
+
+    @staticmethod
+    def _cursor_value(field_obj, value):
+        """游标中的排序键值转换为字段类型，类型或范围不符（游标被篡改）时抛出 ValueError，避免进入数据库查询"""
+        if value is None or isinstance(value, (dict, list)):
+            raise ValueError
+        converted = QueryBuilder._convert_value(field_obj, value)
+        if isinstance(field_obj, fields.DatetimeField) and not isinstance(converted, datetime):
+            raise ValueError
+        constraints = getattr(field_obj, "constraints", {})
+        if isinstance(converted, int) and not constraints.get("ge", converted) <= converted <= constraints.get("le", converted):
+            raise ValueError
+        return converted
+
+    @staticmethod
+    def apply_cursor(query, keys: list[tuple[str, bool]], values: Optional[list], direction: str):
+        """
+        按排序键定位（seek）：(k1, k2, ...) 严格位于游标之后，prev 方向反转比较与排序
+
+        条件展开为 k1 > v1 OR (k1 = v1 AND k2 > v2) OR ...，可利用排序键上的索引，不随页数增加而变慢
+        """
+        backward = direction == "prev"
+        if values is not None:
+            conditions = []
+            for i, (name, descending) in enumerate(keys):
+                operator = "lt" if descending != backward else "gt"
+                equals = {key: value for (key, _), value in zip(keys[:i], values[:i])}
+                conditions.append(Q(**equals, **{f"{name}__{operator}": values[i]}))
+            query = query.filter(Q(*conditions, join_type="OR"))
+        return query.order_by(*[f"{'-' if descending != backward else ''}{name}" for name, descending in keys])
+
     @staticmethod
     async def apply_sorting(query, sort: Optional[str]):
         if not sort:
             return query
 
         sort_fields = sort.split(",")
+        orderings = []
         for field in sort_fields:
             field = field.strip()
             direction = "-" if field.startswith("-") else ""
@@ -102,8 +215,9 @@ class QueryBuilder:
             # 验证字段路径有效性
             if not validate_field_path(query.model, column_name):
                 continue
-            query = query.order_by(f"{direction}{column_name}")
-        return query
+            orderings.append(f"{direction}{column_name}")
+        # order_by 会覆盖之前的排序，多字段需要一次传入
+        return query.order_by(*orderings) if orderings else query
 
     @staticmethod
     async def apply_search(query, search: Optional[str], search_fields: list[str]):
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, List, Optional
 from pydantic import BaseModel, Field
 
 
@@ -38,6 +38,7 @@ class RoleBase(BaseModel):
 
 class RoleCreate(RoleBase):
     permission_ids: List[int] = Field(default=[], description="权限ID列表")
+    parent_ids: List[int] = Field(default=[], description="父角色ID列表，继承父角色的全部权限")
 
 
 class RoleUpdate(BaseModel):
@@ -45,6 +46,7 @@ class RoleUpdate(BaseModel):
     description: Optional[str] = Field(None, description="角色描述")
     is_active: Optional[bool] = Field(None, description="是否启用")
     permission_ids: Optional[List[int]] = Field(None, description="权限ID列表")
+    parent_ids: Optional[List[int]] = Field(None, description="父角色ID列表，继承父角色的全部权限")
 
 
 class RoleResponse(RoleBase):
@@ -57,6 +59,26 @@ class RoleResponse(RoleBase):
         from_attributes = True
 
 
+class RowPolicyCreate(BaseModel):
+    resource: str = Field(..., description="资源名称")
+    action: str = Field(..., description="操作类型")
+    condition: dict[str, Any] = Field(..., description="过滤条件，如 {\"user_id\": \"${user.id}\"}")
+    description: Optional[str] = Field(None, description="策略描述")
+
+
+class RowPolicyResponse(RowPolicyCreate):
+    id: int = Field(..., description="策略ID")
+    role_id: int = Field(..., description="角色ID")
+    created_at: Optional[datetime] = Field(None, description="创建时间")
+
+    class Config:
+        from_attributes = True
+
+
+class PermissionCheckRequest(BaseModel):
+    permissions: List[str] = Field(..., max_length=500, description="待检查的权限列表，格式为 resource:action")
+
+
 class UserRoleRequest(BaseModel):
     role_ids: List[int] = Field(..., description="角色ID列表")
 
@@ -0,0 +1,110 @@
+"""认证链路基准测试：对比 get_current_user 冷路径（解码 token + 查询用户）与缓存命中路径的耗时，
+以及权限检查走数据库与使用 token 权限快照的耗时
+
+需要可用的 Redis（会话纪元、用户与权限二级缓存）
+"""
+
+import sys
+import os
+import time
+
+# 获取当前脚本所在目录
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# 项目根目录
+project_root = os.path.dirname(current_dir)
+# 将根目录加入 Python 路径
+sys.path.append(project_root)
+
+from starlette.requests import Request
+
+from core.auth_cache import invalidate_principal, principal_cache, token_cache
+from core.deps import get_current_user
+from core.permission_registry import encode_mask
+from core.rbac_cache import get_user_permission_mask, get_user_rbac_version, invalidate_users
+from core.session import epoch_cache
+from models.role import Permission, Role, RoleClosure, UserRole
+from models.user import User
+from schemas.auth import JWTPayload
+from utils.jwt_utils import create_access_token, TokenType
+
+
+async def bench(iterations: int = 2000):
+    user = await User.create(username="bench", password="x", is_staff=True, last_login=None)
+    token = create_access_token(
+        TokenType.ACCESS,
+        JWTPayload(user_id=user.id, username=user.username, is_superuser=False, login_time=0),
+    )
+
+    # 冷路径：每次调用前清空缓存
+    start = time.perf_counter()
+    for _ in range(iterations):
+        token_cache.clear()
+        epoch_cache.clear()
+        await invalidate_principal(user.id)
+        await get_current_user(Request({"type": "http"}), token)
+    cold = (time.perf_counter() - start) / iterations
+
+    # 热路径：缓存命中
+    token_cache.clear()
+    await get_current_user(Request({"type": "http"}), token)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await get_current_user(Request({"type": "http"}), token)
+    warm = (time.perf_counter() - start) / iterations
+
+    print(f"冷路径: {cold * 1e6:.1f} us/次")
+    print(f"热路径: {warm * 1e6:.1f} us/次")
+    print(f"加速比: {cold / warm:.1f}x")
+    print(f"token 缓存统计: {token_cache.stats()}")
+    print(f"用户缓存统计: {principal_cache.stats()}")
+
+
+async def bench_permission_check(iterations: int = 500):
+    role = await Role.create(name="bench", code="bench")
+    await RoleClosure.create(ancestor=role, descendant=role, depth=0)
+    for i in range(50):
+        permission = await Permission.create(
+            name=f"bench {i}", code=f"bench_{i}:read", resource=f"bench_{i}", action="read"
+        )
+        await role.permissions.add(permission)
+    user = await User.create(username="bench_perm", password="x", is_staff=True)
+    await UserRole.create(user=user, role=role)
+
+    # 数据库：每次失效缓存后重新计算
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await invalidate_users([user.id])
+        await User(id=user.id).has_permission("bench_7", "read")
+    db = (time.perf_counter() - start) / iterations
+
+    # token 快照：版本一致时直接解码 token 中的掩码
+    snapshot = (await get_user_rbac_version(user.id), encode_mask(await get_user_permission_mask(user.id)))
+    start = time.perf_counter()
+    for _ in range(iterations):
+        instance = User(id=user.id)
+        instance._token_snapshot = snapshot
+        await instance.has_permission("bench_7", "read")
+    embedded = (time.perf_counter() - start) / iterations
+
+    print(f"\n权限检查（数据库）: {db * 1e6:.1f} us/次")
+    print(f"权限检查（token 快照）: {embedded * 1e6:.1f} us/次")
+
+
+if __name__ == "__main__":
+    import asyncio
+    from tortoise import Tortoise
+
+    async def main():
+        # 默认使用内存 SQLite，可通过 BENCH_DATABASE_URL 指向真实数据库（会写入测试用户）
+        await Tortoise.init(
+            db_url=os.getenv("BENCH_DATABASE_URL", "sqlite://:memory:"),
+            modules={"models": [f"models.{module}" for module in __import__("models").__all__]},
+        )
+        await Tortoise.generate_schemas()
+
+        await bench()
+        await bench_permission_check()
+
+        await Tortoise.close_connections()
+
+    asyncio.run(main())
@@ -0,0 +1,71 @@
+"""列表接口延迟基准测试：对运行中的服务并发请求 /api/operation_log/，统计延迟分布
+
+对比总数与当前页并发查询的效果时，分别以 LIST_CONCURRENT_QUERIES=false / true 启动服务各运行一次。
+
+用法:
+    python scripts/bench_list.py [--url http://127.0.0.1:8000] [--username admin] [--password 123456]
+                                 [--requests 500] [--concurrency 10] [--params "module=user&count=exact"]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+async def login(client: httpx.AsyncClient, username: str, password: str) -> str:
+    response = await client.post("/api/auth/login", data={"username": username, "password": password})
+    response.raise_for_status()
+    return response.json()["data"]["access_token"]
+
+
+async def bench(url: str, username: str, password: str, total: int, concurrency: int, params: str, path: str):
+    async with httpx.AsyncClient(base_url=url, timeout=30) as client:
+        token = await login(client, username, password)
+        headers = {"Authorization": f"Bearer {token}"}
+        target = f"{path}?{params}" if params else path
+
+        # 预热：建立连接、填充认证与权限缓存
+        for _ in range(concurrency):
+            (await client.get(target, headers=headers)).raise_for_status()
+
+        latencies = []
+        errors = 0
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one():
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(target, headers=headers)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*[one() for _ in range(total)])
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"请求: {target}  次数: {total}  并发: {concurrency}  失败: {errors}")
+    print(f"吞吐: {total / elapsed:.1f} req/s")
+    print(f"平均: {statistics.mean(latencies) * 1000:.2f} ms")
+    print(f"P50: {latencies[len(latencies) // 2] * 1000:.2f} ms")
+    print(f"P95: {latencies[int(len(latencies) * 0.95) - 1] * 1000:.2f} ms")
+    print(f"P99: {latencies[int(len(latencies) * 0.99) - 1] * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="列表接口延迟基准测试")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="服务地址")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="123456")
+    parser.add_argument("--requests", type=int, default=500, help="请求总数")
+    parser.add_argument("--concurrency", type=int, default=10, help="并发数")
+    parser.add_argument("--params", default="", help="查询参数，如 module=user&count=exact")
+    parser.add_argument("--path", default="/api/operation_log/", help="列表接口路径")
+    args = parser.parse_args()
+
+    asyncio.run(bench(args.url, args.username, args.password, args.requests, args.concurrency, args.params, args.path))
@@ -0,0 +1,90 @@
+"""权限检查微基准：对比对象列表扫描、集合查找、整数位掩码与字节位掩码四种表示，
+以及 access token 写入权限快照后的长度与解码开销
+
+不依赖数据库，按 PERMISSIONS/ROLES 构造随机的角色-权限关系。
+"""
+
+import sys
+import os
+import random
+import time
+from collections import namedtuple
+
+# 获取当前脚本所在目录
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# 项目根目录
+project_root = os.path.dirname(current_dir)
+# 将根目录加入 Python 路径
+sys.path.append(project_root)
+
+import jwt
+
+from core.permission_registry import build_mask, decode_mask, encode_mask, has_bit
+
+PERMISSIONS = 5000
+ROLES = 48
+PERMISSIONS_PER_ROLE = 300
+USER_ROLES = 6
+CHECKS = 20000
+
+FakePermission = namedtuple("FakePermission", ["id", "resource", "action"])
+
+
+def timeit(label: str, func, queries) -> None:
+    start = time.perf_counter()
+    hits = sum(1 for query in queries if func(query))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<12} {elapsed / len(queries) * 1e9:>10.0f} ns/次  (命中 {hits})")
+
+
+def main():
+    random.seed(42)
+    actions = ["create", "read", "update", "delete", "manage"]
+    permissions = [
+        FakePermission(i, f"resource_{i // len(actions)}", actions[i % len(actions)])
+        for i in range(1, PERMISSIONS + 1)
+    ]
+    roles = [random.sample(permissions, PERMISSIONS_PER_ROLE) for _ in range(ROLES)]
+    user_roles = random.sample(roles, USER_ROLES)
+
+    # 旧实现：去重后的权限对象列表，逐个比较字符串
+    effective = list({p.id: p for role in user_roles for p in role}.values())
+    # 集合：(resource, action) 元组
+    effective_set = {(p.resource, p.action) for p in effective}
+    # 整数位掩码：按位与的开销随权限ID增大而增长
+    flags = {(p.resource, p.action): 1 << p.id for p in permissions}
+    int_mask = 0
+    for p in effective:
+        int_mask |= 1 << p.id
+    # 字节位掩码（PermissionRegistry 的实现）：注册表保存 (字节下标, 位标志)
+    positions = {(p.resource, p.action): (p.id >> 3, 1 << (p.id & 7)) for p in permissions}
+    start = time.perf_counter()
+    mask = build_mask(p.id for p in effective)
+    build_cost = time.perf_counter() - start
+
+    queries = [(p.resource, p.action) for p in random.choices(permissions, k=CHECKS)]
+
+    print(f"权限 {PERMISSIONS} 个，角色 {ROLES} 个，用户持有 {USER_ROLES} 个角色 / {len(effective)} 项权限")
+    print(f"掩码构建耗时 {build_cost * 1e6:.0f} us，掩码大小 {len(mask)} 字节\n")
+    timeit("列表扫描", lambda q: any(p.resource == q[0] and p.action == q[1] for p in effective), queries)
+    timeit("集合查找", lambda q: q in effective_set, queries)
+    timeit("整数位掩码", lambda q: bool(int_mask & flags.get(q, 0)), queries)
+    timeit("字节位掩码", lambda q: has_bit(mask, positions.get(q)), queries)
+
+    # token 权限快照：对比不带快照与带快照的 token 长度和解码耗时
+    claims = {"user_id": 1, "username": "bench", "is_superuser": False, "login_time": 0, "session_epoch": 1}
+    plain = jwt.encode(claims, "bench-secret", algorithm="HS256")
+    embedded = jwt.encode({**claims, "perms": encode_mask(mask), "rbac_ver": "1.1"}, "bench-secret", algorithm="HS256")
+    print(f"\ntoken 长度：无快照 {len(plain)} 字节，带快照 {len(embedded)} 字节")
+    timeit("解码无快照", lambda q: jwt.decode(plain, "bench-secret", algorithms=["HS256"]), queries[:2000])
+    timeit(
+        "解码带快照",
+        lambda q: has_bit(
+            decode_mask(jwt.decode(embedded, "bench-secret", algorithms=["HS256"])["perms"]), positions.get(q)
+        ),
+        queries[:2000],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""响应序列化基准测试：对比 FastAPI 默认流程（校验 → 字典 → json.dumps）与 SchemaRoute（校验 → pydantic-core 直接输出 JSON）
+
+使用与 CRUDBase.list 相同结构的分页数据（用户、角色、操作日志列表），不需要数据库。
+
+用法:
+    python scripts/bench_serialization.py [--rows 100] [--iterations 500]
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import time
+from datetime import datetime, timezone
+
+# 获取当前脚本所在目录
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# 项目根目录
+project_root = os.path.dirname(current_dir)
+# 将根目录加入 Python 路径
+sys.path.append(project_root)
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+
+from schemas.auth import UserResponse
+from schemas.operation_log import OperationLogResponse
+from schemas.rbac import PermissionResponse, RoleResponse
+from utils.common import PaginationResponse, ResponseSchema
+from utils.response import SchemaRoute
+
+
+def build_pages(rows: int) -> dict[str, tuple[type, ResponseSchema]]:
+    now = datetime.now(timezone.utc)
+    users = [
+        UserResponse(id=i, username=f"user{i}", nickname=f"用户{i}", is_active=True, is_staff=True, last_login=now)
+        for i in range(rows)
+    ]
+    permissions = [
+        PermissionResponse(id=i, name=f"权限{i}", code=f"res{i}:read", resource=f"res{i}", action="read",
+                           created_at=now, updated_at=now)
+        for i in range(8)
+    ]
+    roles = [
+        RoleResponse(id=i, name=f"角色{i}", code=f"role{i}", created_at=now, updated_at=now, permissions=permissions)
+        for i in range(rows)
+    ]
+    logs = [
+        OperationLogResponse(
+            id=i, user_id=1, user_name="admin", module="user", table_name="users", record_id=i, action="UPDATE",
+            method="PUT", path=f"/api/user/{i}", old_data={"nickname": "旧昵称", "tags": list(range(20))},
+            new_data={"nickname": "新昵称", "tags": list(range(20))}, ip_address="127.0.0.1",
+            user_agent="Mozilla/5.0", status="SUCCESS", created_at=now, updated_at=now,
+        )
+        for i in range(rows)
+    ]
+    pagination = {"total": rows * 10, "page": 1, "page_size": rows, "pages": 10, "total_exact": True}
+    return {
+        "用户列表": (UserResponse, ResponseSchema(data={"items": users, "pagination": pagination})),
+        "角色列表": (RoleResponse, ResponseSchema(data={"items": roles, "pagination": pagination})),
+        "操作日志列表": (OperationLogResponse, ResponseSchema(data={"items": logs, "pagination": pagination})),
+    }
+
+
+async def endpoint():
+    pass
+
+
+async def bench(rows: int, iterations: int):
+    for name, (item_model, content) in build_pages(rows).items():
+        response_model = ResponseSchema[PaginationResponse[item_model]]
+        default_route = APIRoute("/", endpoint, response_model=response_model, response_model_exclude_unset=True)
+        schema_route = SchemaRoute("/", endpoint, response_model=response_model, response_model_exclude_unset=True)
+
+        async def default_path():
+            data = await serialize_response(
+                field=default_route.response_field, response_content=content, exclude_unset=True
+            )
+            return JSONResponse(data).body
+
+        assert await default_path() == schema_route.render(content), f"{name} 输出不一致"
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await default_path()
+        default = (time.perf_counter() - start) / iterations
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            schema_route.render(content)
+        fast = (time.perf_counter() - start) / iterations
+
+        print(f"{name}（{rows} 行）: 默认 {default * 1e3:.3f} ms，SchemaRoute {fast * 1e3:.3f} ms，加速比 {default / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="响应序列化基准测试")
+    parser.add_argument("--rows", type=int, default=100, help="每页行数")
+    parser.add_argument("--iterations", type=int, default=500, help="每种数据的序列化次数")
+    args = parser.parse_args()
+
+    asyncio.run(bench(args.rows, args.iterations))
@@ -0,0 +1,107 @@
+"""按本机性能校准 argon2 参数
+
+在目标耗时内优先选择更大的 memory_cost，再在该内存下尽量提高 time_cost。
+结果以 .env 格式输出，使用 --write 时直接写入项目根目录的 .env 文件。
+已有用户的密码哈希会在下次登录成功时按新参数重新计算。
+
+用法:
+    python scripts/calibrate_argon2.py [--target-ms 250] [--parallelism 2] [--write]
+"""
+
+import sys
+import os
+import argparse
+import statistics
+import time
+
+# 获取当前脚本所在目录
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# 项目根目录
+project_root = os.path.dirname(current_dir)
+# 将根目录加入 Python 路径
+sys.path.append(project_root)
+
+from passlib.hash import argon2
+
+from config import settings
+
+# 候选内存（KiB），从 16 MiB 到 1 GiB
+MEMORY_CANDIDATES = [16384, 32768, 65536, 131072, 262144, 524288, 1048576]
+MIN_TIME_COST = 2
+MAX_TIME_COST = 16
+
+
+def measure(time_cost: int, memory_cost: int, parallelism: int, samples: int = 3) -> float:
+    """测量单次哈希耗时（毫秒），取中位数"""
+    hasher = argon2.using(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+    durations = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.hash("calibrate-argon2")
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations)
+
+
+def calibrate(target_ms: float, parallelism: int) -> tuple[int, int, float]:
+    best = None
+    for memory_cost in MEMORY_CANDIDATES:
+        elapsed = measure(MIN_TIME_COST, memory_cost, parallelism)
+        print(f"memory_cost={memory_cost:>8} time_cost={MIN_TIME_COST:>2}: {elapsed:.1f} ms")
+        if elapsed > target_ms:
+            break
+        best = (MIN_TIME_COST, memory_cost, elapsed)
+
+    if best is None:
+        raise SystemExit(f"最小参数 (memory_cost={MEMORY_CANDIDATES[0]}) 已超出目标耗时 {target_ms} ms")
+
+    time_cost, memory_cost, elapsed = best
+    while time_cost < MAX_TIME_COST:
+        candidate = measure(time_cost + 1, memory_cost, parallelism)
+        print(f"memory_cost={memory_cost:>8} time_cost={time_cost + 1:>2}: {candidate:.1f} ms")
+        if candidate > target_ms:
+            break
+        time_cost, elapsed = time_cost + 1, candidate
+
+    return time_cost, memory_cost, elapsed
+
+
+def write_env(values: dict[str, int], env_path: str) -> None:
+    """更新 .env 中的对应配置项，不存在时追加"""
+    lines = []
+    if os.path.exists(env_path):
+        with open(env_path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+
+    remaining = dict(values)
+    for i, line in enumerate(lines):
+        key = line.split("=", 1)[0].strip()
+        if key in remaining:
+            lines[i] = f"{key}={remaining.pop(key)}"
+    lines.extend(f"{key}={value}" for key, value in remaining.items())
+
+    with open(env_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="按本机性能校准 argon2 参数")
+    parser.add_argument("--target-ms", type=float, default=settings.ARGON2_TARGET_MS, help="单次哈希目标耗时（毫秒）")
+    parser.add_argument("--parallelism", type=int, default=settings.ARGON2_PARALLELISM or 2, help="并行度")
+    parser.add_argument("--write", action="store_true", help="将结果写入 .env")
+    args = parser.parse_args()
+
+    time_cost, memory_cost, elapsed = calibrate(args.target_ms, args.parallelism)
+    values = {
+        "ARGON2_TIME_COST": time_cost,
+        "ARGON2_MEMORY_COST": memory_cost,
+        "ARGON2_PARALLELISM": args.parallelism,
+    }
+
+    print(f"\n校准结果（单次哈希约 {elapsed:.1f} ms）:")
+    for key, value in values.items():
+        print(f"{key}={value}")
+
+    if args.write:
+        env_path = os.path.join(project_root, ".env")
+        write_env(values, env_path)
+        print(f"已写入 {env_path}")
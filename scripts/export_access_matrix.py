@@ -0,0 +1,53 @@
+"""导出用户 × 权限访问矩阵（CSV 或 numpy 压缩格式 NPZ），需要安装可选依赖 export（numpy）：uv sync --extra export
+
+用法：python scripts/export_access_matrix.py -o access_matrix.csv
+      python scripts/export_access_matrix.py --format npz -o access_matrix.npz
+"""
+
+import sys
+import os
+import argparse
+
+# 获取当前脚本所在目录
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# 项目根目录
+project_root = os.path.dirname(current_dir)
+# 将根目录加入 Python 路径
+sys.path.append(project_root)
+
+from config import settings
+from core.access_matrix import build_access_matrix
+
+
+async def export(output: str, fmt: str):
+    matrix = await build_access_matrix()
+    if fmt == "npz":
+        with open(output, "wb") as f:
+            f.write(matrix.to_npz())
+    else:
+        with open(output, "w", encoding="utf-8", newline="") as f:
+            for chunk in matrix.iter_csv():
+                f.write(chunk)
+    print(f"已导出 {len(matrix.user_ids)} 个用户 × {len(matrix.permission_ids)} 个权限 → {output}")
+
+
+if __name__ == "__main__":
+    import asyncio
+    from tortoise import Tortoise
+
+    parser = argparse.ArgumentParser(description="导出用户权限访问矩阵")
+    parser.add_argument("--format", choices=["csv", "npz"], default="csv", help="导出格式")
+    parser.add_argument("-o", "--output", required=True, help="输出文件路径")
+    args = parser.parse_args()
+
+    async def main():
+        await Tortoise.init(
+            db_url=settings.DATABASE_URL,
+            modules={"models": [f"models.{module}" for module in __import__("models").__all__]},
+        )
+
+        await export(args.output, args.format)
+
+        await Tortoise.close_connections()
+
+    asyncio.run(main())
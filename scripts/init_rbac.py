@@ -11,6 +11,7 @@ project_root = os.path.dirname(current_dir)
 sys.path.append(project_root)
 
 from config import settings
+from core.permission_catalog import permission_catalog
 from models.role import Permission, Role
 from models.user import User
 
@@ -52,6 +53,9 @@ async def init_permissions():
         if created:
             created_permissions.append(permission)
             print(f"创建权限: {permission.name}")
+
+    if created_permissions:
+        permission_catalog.invalidate()
     
     return created_permissions
 
@@ -108,13 +112,17 @@ async def init_roles():
         if created:
             # 分配权限给角色
             permission_codes = role_data["permissions"]
-            permissions = await Permission.filter(code__in=permission_codes)
+            permissions = await permission_catalog.by_codes(permission_codes)
             await role.permissions.add(*permissions)
             
             created_roles.append(role)
             print(f"创建角色: {role.name}, 权限数量: {len(permissions)}")
         else:
             print(f"角色已存在: {role.name}")
+
+    # 补齐角色继承闭包的自身记录
+    from controllers.role import role_controller
+    await role_controller.ensure_closure()
     
     return created_roles
 
@@ -157,6 +165,11 @@ async def init_rbac_system():
     # 3. 创建管理员用户
     print("创建管理员用户...")
     await create_admin_user()
+
+    # 4. 递增 RBAC 版本并通知运行中的进程：权限目录、注册表、用户权限缓存与 token 快照随之失效，
+    #    同时重建用户有效权限物化表（RBAC_MATERIALIZE_USER_PERMISSIONS 开启时）
+    from core.rbac_cache import bump_rbac_version
+    await bump_rbac_version()
     
     print("RBAC系统初始化完成!")
 
@@ -165,6 +178,8 @@ if __name__ == "__main__":
     import asyncio
     from tortoise import Tortoise
 
+    from core.redis_manager import redis_manager
+
     async def main():
         # 这里需要根据你的数据库配置进行调整
         await Tortoise.init(
@@ -176,5 +191,6 @@ if __name__ == "__main__":
         await init_rbac_system()
 
         await Tortoise.close_connections()
+        await redis_manager.close()
 
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,130 @@
+"""
+测试公共夹具
+
+数据库使用内存 SQLite，每个测试一个新库；Redis 替换为进程内字典实现，只覆盖项目用到的命令。
+项目未依赖 pytest-asyncio，异步代码通过 run_db 在新的事件循环中执行。
+"""
+
+import asyncio
+import fnmatch
+import time
+
+import pytest
+from tortoise import Tortoise
+
+from core.auth_cache import principal_cache
+from core.permission_catalog import permission_catalog
+from core.permission_registry import permission_registry
+from core.rbac_cache import mask_cache, version_cache
+from core.rbac_snapshot import rbac_snapshot
+from core.redis_manager import redis_manager
+from core.row_policy import policy_cache
+
+
+class MemoryRedis:
+    """测试用的内存 Redis，过期时间按调用时的单调时钟计算"""
+
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+
+    def _alive(self, key):
+        deadline = self.expires.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def _expire(self, key, seconds):
+        if seconds:
+            self.expires[key] = time.monotonic() + seconds
+        else:
+            self.expires.pop(key, None)
+
+    async def get(self, key):
+        return self.data.get(key) if self._alive(key) else None
+
+    async def mget(self, keys):
+        return [await self.get(key) for key in keys]
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and self._alive(key):
+            return None
+        self.data[key] = value
+        self._expire(key, ex)
+        return True
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+
+    async def incr(self, key, amount=1):
+        value = int(await self.get(key) or 0) + amount
+        self.data[key] = str(value)
+        return value
+
+    async def sadd(self, key, *values):
+        if not self._alive(key):
+            self.data[key] = set()
+        self.data[key].update(str(value) for value in values)
+
+    async def smembers(self, key):
+        return set(self.data[key]) if self._alive(key) else set()
+
+    async def expire(self, key, seconds):
+        if not self._alive(key):
+            return False
+        self._expire(key, seconds)
+        return True
+
+    async def ttl(self, key):
+        if not self._alive(key):
+            return -2
+        deadline = self.expires.get(key)
+        return -1 if deadline is None else int(deadline - time.monotonic())
+
+    async def publish(self, channel, message):
+        return 0
+
+    async def scan_iter(self, match="*"):
+        for key in list(self.data):
+            if self._alive(key) and fnmatch.fnmatch(key, match):
+                yield key
+
+
+def reset_caches():
+    """清空进程内缓存，避免测试之间互相影响"""
+    for cache in (mask_cache, version_cache, principal_cache, policy_cache):
+        cache.clear()
+    permission_catalog.invalidate()
+    permission_registry.invalidate()
+    rbac_snapshot.invalidate()
+
+
+@pytest.fixture
+def memory_redis():
+    original = redis_manager._redis
+    redis_manager._redis = MemoryRedis()
+    yield redis_manager._redis
+    redis_manager._redis = original
+
+
+@pytest.fixture
+def run_db(memory_redis):
+    """在新的内存 SQLite 数据库上运行协程函数，返回其结果"""
+    def run(func, *args):
+        async def main():
+            reset_caches()
+            await Tortoise.init(
+                db_url="sqlite://:memory:",
+                modules={"models": [f"models.{module}" for module in __import__("models").__all__]},
+            )
+            await Tortoise.generate_schemas()
+            try:
+                return await func(*args)
+            finally:
+                await Tortoise.close_connections()
+                reset_caches()
+        return asyncio.run(main())
+    return run
@@ -0,0 +1,20 @@
+"""用户缓存：Redis 故障不影响已提交的用户变更"""
+
+import asyncio
+
+from redis.exceptions import ConnectionError
+
+from core.auth_cache import invalidate_principal, principal_cache
+
+
+def test_invalidate_principal_tolerates_redis_errors(memory_redis, monkeypatch, caplog):
+    async def unavailable(*keys):
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(memory_redis, "delete", unavailable)
+    principal_cache.set(1, {"id": 1})
+
+    asyncio.run(invalidate_principal(1))
+
+    assert principal_cache.get(1) is None
+    assert "用户 1" in caplog.text
@@ -0,0 +1,103 @@
+"""游标分页：存在并列值、混合排序方向时前后翻页的顺序，以及无效游标返回 400"""
+
+import base64
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from controllers.user import user_controller
+from models.user import User
+from schemas.auth import UserResponse
+from schemas.page import QueryParams
+
+NAMES = ["h", "c", "f", "a", "g", "b", "e", "d"]
+
+
+async def _seed() -> list[User]:
+    # is_staff 只有两种取值，排序时大量并列
+    return [
+        await User.create(username=name, password="x", is_staff=index % 3 == 0)
+        for index, name in enumerate(NAMES)
+    ]
+
+
+async def _page(sort: str, cursor: str, page_size: int = 3) -> dict:
+    params = QueryParams(sort=sort, cursor=cursor, page_size=page_size, count="none")
+    return await user_controller.list(params, UserResponse)
+
+
+async def _walk(sort: str) -> tuple[list[list[str]], list[list[str]]]:
+    """从第一页向后翻到最后一页，再从最后一页向前翻回第一页，返回两次经过的各页用户名"""
+    forward, result = [], await _page(sort, "")
+    while True:
+        forward.append([item.username for item in result["items"]])
+        cursor = result["pagination"]["next_cursor"]
+        if cursor is None:
+            break
+        result = await _page(sort, cursor)
+
+    backward = [forward[-1]]
+    while result["pagination"]["prev_cursor"] is not None:
+        result = await _page(sort, result["pagination"]["prev_cursor"])
+        backward.append([item.username for item in result["items"]])
+    return forward, backward
+
+
+def _expected(users: list[User], key) -> list[str]:
+    return [user.username for user in sorted(users, key=key)]
+
+
+@pytest.mark.parametrize(
+    "sort, key",
+    [
+        # 并列值按 id 决定顺序
+        ("is_staff", lambda user: (user.is_staff, user.id)),
+        ("-is_staff", lambda user: (not user.is_staff, -user.id)),
+        # 混合方向
+        ("is_staff,-username", lambda user: (user.is_staff, [-ord(c) for c in user.username])),
+        ("-is_staff,username", lambda user: (not user.is_staff, user.username)),
+    ],
+)
+def test_walks_forward_and_back_across_ties(run_db, sort, key):
+    async def run():
+        users = await _seed()
+        return _expected(users, key), await _walk(sort)
+
+    expected, (forward, backward) = run_db(run)
+    assert [name for page in forward for name in page] == expected
+    assert all(len(page) == 3 for page in forward[:-1])
+    assert backward == forward[::-1]
+
+
+def _encode(payload) -> str:
+    raw = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+@pytest.mark.parametrize(
+    "sort, cursor",
+    [
+        ("is_staff", "%%%not-base64%%%"),
+        ("is_staff", _encode(b"not json")),
+        ("is_staff", _encode(b"\xff\xfe")),
+        ("is_staff", _encode(["is_staff", "id"])),
+        ("is_staff", _encode({"k": ["username", "id"], "v": ["a", 1], "d": "next"})),
+        ("is_staff", _encode({"k": ["is_staff", "id"], "v": [True, 1], "d": "sideways"})),
+        ("is_staff", _encode({"k": ["is_staff", "id"], "v": [True], "d": "next"})),
+        ("is_staff", _encode({"k": ["is_staff", "id"], "v": [True, "abc"], "d": "next"})),
+        ("is_staff", _encode({"k": ["is_staff", "id"], "v": [True, {"$gt": 1}], "d": "next"})),
+        ("is_staff", _encode({"k": ["is_staff", "id"], "v": [True, None], "d": "next"})),
+        ("is_staff", _encode({"k": ["is_staff", "id"], "v": [True, 10 ** 30], "d": "next"})),
+        ("created_at", _encode({"k": ["created_at", "id"], "v": ["yesterday", 1], "d": "next"})),
+        ("created_at", _encode({"k": ["created_at", "id"], "v": [12345, 1], "d": "next"})),
+    ],
+)
+def test_malformed_or_tampered_cursor_is_rejected(run_db, sort, cursor):
+    async def run():
+        await _seed()
+        with pytest.raises(HTTPException) as exc:
+            await _page(sort, cursor)
+        return exc.value.status_code
+
+    assert run_db(run) == 400
@@ -0,0 +1,36 @@
+"""密码哈希进程池：工作进程异常退出后自动重建"""
+
+import asyncio
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from utils.password import PasswordHasher
+
+
+def test_hasher_recovers_from_dead_worker():
+    hasher = PasswordHasher(max_workers=1, max_pending=10)
+
+    async def run():
+        hashed = await hasher.hash("secret")
+
+        # 工作进程被外部杀死：下一次请求重建进程池后成功
+        for process in list(hasher._executor._processes.values()):
+            process.kill()
+            process.join()
+        assert await hasher.verify("secret", hashed)
+
+        # 任务本身使工作进程退出：重试一次后仍失败，但不影响之后的请求
+        with pytest.raises(BrokenProcessPool):
+            await hasher._run(os._exit, 1)
+        assert await hasher.verify("secret", hashed)
+        assert not await hasher.verify("wrong", hashed)
+        return hasher.stats()
+
+    try:
+        stats = asyncio.run(run())
+    finally:
+        hasher.shutdown()
+    assert stats["restarts"] == 3
+    assert stats["failed"] == 1
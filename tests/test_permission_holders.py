@@ -0,0 +1,27 @@
+"""按权限反查用户：只包含启用的用户"""
+
+from controllers.permission import permission_controller
+from controllers.role import role_controller
+from models.role import Permission, UserRole
+from models.user import User
+from schemas.rbac import RoleCreate
+
+
+def test_holders_exclude_deactivated_users(run_db):
+    async def run():
+        read = await Permission.create(name="查看用户", code="user:read", resource="user", action="read")
+        manage = await Permission.create(name="管理用户", code="user:manage", resource="user", action="manage")
+        parent = await role_controller.create_role(RoleCreate(name="parent", code="parent", permission_ids=[manage.id]))
+        child = await role_controller.create_role(RoleCreate(name="child", code="child", parent_ids=[parent.id]))
+
+        for username, is_active in (("active", True), ("inactive", False)):
+            user = await User.create(username=username, password="x", is_active=is_active)
+            await UserRole.create(user_id=user.id, role_id=child.id)
+        await User.create(username="root", password="x", is_superuser=True)
+        await User.create(username="retired-root", password="x", is_superuser=True, is_active=False)
+        await User.create(username="no-role", password="x")
+
+        query = await permission_controller.holders_query(read.id)
+        return set(await query.values_list("username", flat=True))
+
+    assert run_db(run) == {"active", "root"}
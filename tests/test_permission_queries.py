@@ -0,0 +1,106 @@
+"""
+权限查询次数回归测试：get_permissions / has_permission / has_any_role 的查询次数与角色、权限数量无关，
+且结果包含经继承获得的权限与角色
+"""
+
+from tortoise import Tortoise
+
+from controllers.role import role_controller
+from core.permission_registry import permission_registry
+from core.rbac_cache import mask_cache, version_cache
+from core.redis_manager import redis_manager
+from models.role import Permission, UserRole
+from models.user import User
+from schemas.rbac import RoleCreate
+
+from tests.conftest import reset_caches
+
+EXECUTE_METHODS = ("execute_query", "execute_query_dict", "execute_insert", "execute_many", "execute_script")
+
+
+class QueryCounter:
+    """包装数据库连接的执行方法，统计执行的 SQL 语句数"""
+
+    def __init__(self, client):
+        self.count = 0
+        for name in EXECUTE_METHODS:
+            setattr(client, name, self._wrap(getattr(client, name)))
+
+    def _wrap(self, method):
+        async def wrapper(*args, **kwargs):
+            self.count += 1
+            return await method(*args, **kwargs)
+        return wrapper
+
+
+async def _create_user(name: str, roles: int, permissions_per_role: int) -> tuple[int, set[str], str]:
+    """
+    创建用户，持有 roles 个角色，每个角色继承上一个角色并直接授予 permissions_per_role 个权限
+
+    Returns:
+        (用户ID, 全部有效权限代码, 最顶层祖先角色代码)
+    """
+    user = await User.create(username=name, password="x", is_staff=True)
+    codes = set()
+    parent_ids = []
+    for r in range(roles):
+        permissions = [
+            await Permission.create(
+                name=f"{name}-{r}-{p}", code=f"{name}{r}:action{p}", resource=f"{name}{r}", action=f"action{p}"
+            )
+            for p in range(permissions_per_role)
+        ]
+        codes.update(permission.code for permission in permissions)
+        role = await role_controller.create_role(
+            RoleCreate(
+                name=f"{name}-role{r}",
+                code=f"{name}_role{r}",
+                permission_ids=[permission.id for permission in permissions],
+                parent_ids=parent_ids,
+            )
+        )
+        parent_ids = [role.id]
+    # 只直接分配最后一个角色，其余角色与权限都经继承获得
+    await UserRole.create(user_id=user.id, role_id=parent_ids[0])
+    return user.id, codes, f"{name}_role0"
+
+
+async def _measure(counter: QueryCounter, name: str, roles: int, permissions_per_role: int) -> dict[str, int]:
+    """冷缓存下，对新的用户实例分别执行三个方法，校验结果并返回各自的查询次数"""
+    user_id, codes, root_role = await _create_user(name, roles, permissions_per_role)
+    reset_caches()
+    # 权限注册表为进程级缓存，预先加载，不计入单次检查
+    await permission_registry.load()
+
+    inherited = f"{name}0", "action0"
+    checks = (
+        ("get_permissions", (), lambda result: {permission.code for permission in result} == codes),
+        ("has_permission", inherited, lambda result: result is True),
+        ("has_any_role", ([root_role],), lambda result: result is True),
+    )
+    counts = {}
+    for method, args, check in checks:
+        redis_manager._redis.data.clear()
+        mask_cache.clear()
+        version_cache.clear()
+        user = await User.get(id=user_id)
+        counter.count = 0
+        result = await getattr(user, method)(*args)
+        counts[method] = counter.count
+        assert check(result), f"{method}{args} 返回 {result!r}"
+    return counts
+
+
+def test_permission_queries_do_not_grow_with_roles_and_permissions(run_db):
+    async def run():
+        counter = QueryCounter(Tortoise.get_connection("default"))
+        small = await _measure(counter, "small", roles=1, permissions_per_role=1)
+        large = await _measure(counter, "large", roles=6, permissions_per_role=12)
+        return small, large
+
+    small, large = run_db(run)
+    assert small == large
+    assert small["get_permissions"] == 1
+    # 有效权限查询 + 角色 → 用户反向索引登记
+    assert small["has_permission"] == 2
+    assert small["has_any_role"] == 1
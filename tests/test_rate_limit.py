@@ -0,0 +1,84 @@
+"""登录限流：窗口内超过次数返回 429，窗口滑过后恢复，IP 与用户名分别计数"""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import OAuth2PasswordRequestForm
+from starlette.requests import Request
+
+from utils import rate_limit
+from utils.rate_limit import MemoryRateLimitBackend, SlidingWindowRateLimiter, check_login_rate_limit
+
+WINDOW = 60
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture(autouse=True)
+def limiters(monkeypatch):
+    backend = MemoryRateLimitBackend()
+    monkeypatch.setattr(rate_limit, "login_ip_limiter", SlidingWindowRateLimiter(backend, "ip", 5, WINDOW))
+    monkeypatch.setattr(rate_limit, "login_user_limiter", SlidingWindowRateLimiter(backend, "user", 3, WINDOW))
+
+
+def _attempt(ip: str, username: str) -> int:
+    """发起一次登录限流检查，返回 200 或 429"""
+    request = Request({"type": "http", "headers": [], "client": (ip, 50000)})
+    form = OAuth2PasswordRequestForm(username=username, password="x")
+    try:
+        asyncio.run(check_login_rate_limit(request, form))
+    except HTTPException as e:
+        assert e.status_code == 429
+        assert int(e.headers["Retry-After"]) >= 1
+        return 429
+    return 200
+
+
+def test_rejects_after_limit_within_window(clock):
+    results = []
+    for _ in range(4):
+        results.append(_attempt("10.0.0.1", "alice"))
+        clock.now += 1
+    assert results == [200, 200, 200, 429]
+
+
+def test_window_slides_open_again(clock):
+    for _ in range(3):
+        _attempt("10.0.0.1", "alice")
+        clock.now += 10
+    assert _attempt("10.0.0.1", "alice") == 429
+
+    # 第一次尝试滑出窗口后只放行一次
+    clock.now = 1000.0 + WINDOW + 0.5
+    assert _attempt("10.0.0.1", "alice") == 200
+    assert _attempt("10.0.0.1", "alice") == 429
+
+    clock.now += WINDOW
+    assert [_attempt("10.0.0.1", "alice") for _ in range(4)] == [200, 200, 200, 429]
+
+
+def test_ip_and_username_are_counted_independently(clock):
+    # 同一用户名从不同 IP 尝试，仍按用户名限流
+    assert [_attempt(f"10.0.0.{i}", "alice") for i in range(4)] == [200, 200, 200, 429]
+    # 其他用户名不受影响
+    assert _attempt("10.0.0.9", "bob") == 200
+
+    # 同一 IP 轮换用户名，按 IP 限流
+    results = [_attempt("10.0.1.1", f"user{i}") for i in range(6)]
+    assert results == [200, 200, 200, 200, 200, 429]
+    # 其他 IP 不受影响
+    assert _attempt("10.0.1.2", "carol") == 200
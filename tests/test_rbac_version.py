@@ -0,0 +1,34 @@
+"""权限版本：Redis 数据丢失后重新生成的版本不能与旧 token 中的版本相同"""
+
+import asyncio
+
+from core.rbac_cache import bump_rbac_version, get_user_rbac_version, invalidate_users, version_cache
+
+from tests.conftest import reset_caches
+
+
+def test_versions_do_not_repeat_after_redis_data_loss(memory_redis, monkeypatch):
+    # 失效用户时不涉及物化表
+    monkeypatch.setattr("core.rbac_cache.refresh_user_permissions", lambda *args: asyncio.sleep(0))
+
+    async def issue() -> str:
+        """模拟签发 token 时的版本，期间发生若干次权限变更"""
+        await bump_rbac_version()
+        await invalidate_users([1])
+        version_cache.clear()
+        return await get_user_rbac_version(1)
+
+    async def run():
+        reset_caches()
+        before = await issue()
+        memory_redis.data.clear()
+        await asyncio.sleep(0.01)
+        version_cache.clear()
+        fresh = await get_user_rbac_version(1)
+        after = await issue()
+        reset_caches()
+        return before, fresh, after
+
+    before, fresh, after = asyncio.run(run())
+    assert fresh != before
+    assert after != before
@@ -0,0 +1,172 @@
+"""角色继承：闭包表维护、循环拒绝，以及创建 / 更新失败时整体回滚"""
+
+import pytest
+from fastapi import HTTPException
+
+from controllers.role import role_controller
+from models.role import Permission, Role, RoleClosure, RoleInheritance, UserRole
+from models.user import User
+from schemas.rbac import RoleCreate, RoleUpdate
+
+
+async def _role(code: str, parents=(), permissions=()) -> Role:
+    return await role_controller.create_role(
+        RoleCreate(
+            name=code,
+            code=code,
+            parent_ids=[parent.id for parent in parents],
+            permission_ids=[permission.id for permission in permissions],
+        )
+    )
+
+
+async def _permission(resource: str) -> Permission:
+    return await Permission.create(name=resource, code=f"{resource}:read", resource=resource, action="read")
+
+
+async def _closure(*roles: Role) -> set[tuple[str, str, int]]:
+    """指定角色作为后代的闭包记录，(祖先代码, 后代代码, 层级)"""
+    rows = await RoleClosure.filter(descendant_id__in=[role.id for role in roles]).values_list(
+        "ancestor__code", "descendant__code", "depth"
+    )
+    return set(rows)
+
+
+async def _user_with(role: Role) -> User:
+    user = await User.create(username=f"user-{role.code}", password="x")
+    await UserRole.create(user_id=user.id, role_id=role.id)
+    return user
+
+
+async def _codes(user: User) -> set[str]:
+    """新的用户实例，避免实例级缓存"""
+    fresh = await User.get(id=user.id)
+    return {permission.code for permission in await fresh.get_permissions()}
+
+
+async def _status(coro) -> int:
+    with pytest.raises(HTTPException) as exc:
+        await coro
+    return exc.value.status_code
+
+
+def test_reparent_moves_closure_and_inherited_permissions(run_db):
+    async def run():
+        a, b = await _role("a", permissions=[await _permission("pa")]), await _role("b", permissions=[await _permission("pb")])
+        c = await _role("c", parents=[a])
+        d = await _role("d", parents=[c])
+        user = await _user_with(d)
+        before = await _codes(user)
+        await role_controller.update_role(c.id, RoleUpdate(parent_ids=[b.id]))
+        return before, await _codes(user), await _closure(c, d)
+
+    before, after, closure = run_db(run)
+    assert before == {"pa:read"}
+    assert after == {"pb:read"}
+    assert closure == {
+        ("c", "c", 0), ("b", "c", 1),
+        ("d", "d", 0), ("c", "d", 1), ("b", "d", 2),
+    }
+
+
+def test_removing_parent_revokes_inherited_permissions(run_db):
+    async def run():
+        a = await _role("a", permissions=[await _permission("pa")])
+        b = await _role("b", permissions=[await _permission("pb")])
+        c = await _role("c", parents=[a, b])
+        user = await _user_with(c)
+        before = await _codes(user)
+        await role_controller.update_role(c.id, RoleUpdate(parent_ids=[b.id]))
+        return before, await _codes(user), await _closure(c)
+
+    before, after, closure = run_db(run)
+    assert before == {"pa:read", "pb:read"}
+    assert after == {"pb:read"}
+    assert closure == {("c", "c", 0), ("b", "c", 1)}
+
+
+def test_deleting_middle_role_detaches_descendants(run_db):
+    async def run():
+        a = await _role("a", permissions=[await _permission("pa")])
+        b = await _role("b", parents=[a], permissions=[await _permission("pb")])
+        c = await _role("c", parents=[b], permissions=[await _permission("pc")])
+        d = await _role("d", parents=[c])
+        user = await _user_with(d)
+        before = await _codes(user)
+        await role_controller.delete_role(b.id)
+        return (
+            before,
+            await _codes(user),
+            await _closure(c, d),
+            await RoleClosure.filter(ancestor_id=b.id).exists() or await RoleClosure.filter(descendant_id=b.id).exists(),
+            await RoleInheritance.filter(parent_id=b.id).exists(),
+        )
+
+    before, after, closure, b_closure_left, b_links_left = run_db(run)
+    assert before == {"pa:read", "pb:read", "pc:read"}
+    assert after == {"pc:read"}
+    assert closure == {("c", "c", 0), ("d", "d", 0), ("c", "d", 1)}
+    assert not b_closure_left
+    assert not b_links_left
+
+
+def test_cycles_are_rejected(run_db):
+    async def run():
+        a = await _role("a")
+        b = await _role("b", parents=[a])
+        c = await _role("c", parents=[b])
+        return (
+            await _status(role_controller.update_role(a.id, RoleUpdate(parent_ids=[c.id]))),
+            await _status(role_controller.update_role(a.id, RoleUpdate(parent_ids=[a.id]))),
+            await _status(role_controller.set_parents(b.id, [c.id])),
+            await _closure(a, b, c),
+        )
+
+    *statuses, closure = run_db(run)
+    assert statuses == [400, 400, 400]
+    assert closure == {
+        ("a", "a", 0),
+        ("b", "b", 0), ("a", "b", 1),
+        ("c", "c", 0), ("b", "c", 1), ("a", "c", 2),
+    }
+
+
+def test_failed_create_and_update_roll_back(run_db):
+    async def run():
+        pa, pb = await _permission("pa"), await _permission("pb")
+        a = await _role("a")
+        b = await _role("b", permissions=[pa])
+        c = await _role("c", parents=[b])
+        counts = (await Role.all().count(), await RoleClosure.all().count(), await RoleInheritance.all().count())
+
+        statuses = [
+            # 代码重复：角色、闭包自身记录、权限与继承关系都不应写入
+            await _status(role_controller.create_role(
+                RoleCreate(name="dup", code="a", parent_ids=[b.id], permission_ids=[pa.id])
+            )),
+            # 父角色不存在
+            await _status(role_controller.create_role(RoleCreate(name="x", code="x", parent_ids=[9999]))),
+            # 名称重复：父角色与权限变更一并回滚
+            await _status(role_controller.update_role(
+                c.id, RoleUpdate(name="a", parent_ids=[a.id], permission_ids=[pb.id])
+            )),
+            # 循环：在写入任何字段之前拒绝
+            await _status(role_controller.update_role(
+                b.id, RoleUpdate(description="changed", parent_ids=[c.id], permission_ids=[])
+            )),
+        ]
+        b = await Role.get(id=b.id).prefetch_related("permissions")
+        c = await Role.get(id=c.id).prefetch_related("permissions")
+        return (
+            statuses,
+            counts,
+            (await Role.all().count(), await RoleClosure.all().count(), await RoleInheritance.all().count()),
+            (c.name, [p.code for p in c.permissions], await _closure(c)),
+            (b.description, [p.code for p in b.permissions]),
+        )
+
+    statuses, before, after, c, b = run_db(run)
+    assert statuses == [400, 400, 400, 400]
+    assert after == before
+    assert c == ("c", [], {("c", "c", 0), ("b", "c", 1)})
+    assert b == (None, ["pa:read"])
@@ -0,0 +1,85 @@
+"""行级策略：策略只约束其所在角色授予的权限，以及不支持的 resource:action 在创建时被拒绝"""
+
+import pytest
+from fastapi import HTTPException
+
+from controllers.role import role_controller
+from core.row_policy import scoped_query
+from models.role import Permission, UserRole
+from models.user import User
+from schemas.rbac import RoleCreate, RowPolicyCreate
+
+
+async def _setup():
+    read = await Permission.create(name="查看用户", code="user:read", resource="user", action="read")
+    manage = await Permission.create(name="管理用户", code="user:manage", resource="user", action="manage")
+    await Permission.create(name="更新用户", code="user:update", resource="user", action="update")
+    for username in ("alice", "bob", "carol"):
+        await User.create(username=username, password="x")
+
+    async def role(code, permissions, policy=None, parent_ids=()):
+        created = await role_controller.create_role(
+            RoleCreate(name=code, code=code, permission_ids=[p.id for p in permissions], parent_ids=list(parent_ids))
+        )
+        if policy is not None:
+            action, condition = policy
+            await role_controller.create_policy(
+                created.id, RowPolicyCreate(resource="user", action=action, condition=condition)
+            )
+        return created
+
+    return {
+        "restricted": await role("restricted", [read], ("read", {"username": "alice"})),
+        "unrestricted": await role("unrestricted", [read]),
+        "unrelated": await role("unrelated", [], ("read", {"username": "bob"})),
+        "manager": await role("manager", [manage], ("manage", {"username__in": ["alice", "bob"]})),
+    }
+
+
+async def _visible(username: str, roles: list, action: str = "read") -> set[str]:
+    user = await User.create(username=username, password="x")
+    for role in roles:
+        await UserRole.create(user_id=user.id, role_id=role.id)
+    query = await scoped_query(user, "user", action, User)
+    return set(await query.filter(username__in=["alice", "bob", "carol"]).values_list("username", flat=True))
+
+
+def test_policy_only_narrows_grants_of_its_own_role(run_db):
+    async def run():
+        roles = await _setup()
+        child = await role_controller.create_role(
+            RoleCreate(name="child", code="child", parent_ids=[roles["restricted"].id])
+        )
+        return {
+            "restricted": await _visible("u1", [roles["restricted"]]),
+            "restricted+unrestricted": await _visible("u2", [roles["restricted"], roles["unrestricted"]]),
+            "unrelated+unrestricted": await _visible("u3", [roles["unrelated"], roles["unrestricted"]]),
+            "inherited": await _visible("u4", [child]),
+            "manage": await _visible("u5", [roles["manager"]], "manage"),
+            # user:manage 蕴含 user:read，manager 角色上没有 read 策略
+            "manage implies read": await _visible("u6", [roles["manager"]]),
+            "no grant": await _visible("u7", [roles["unrelated"]]),
+        }
+
+    visible = run_db(run)
+    everyone = {"alice", "bob", "carol"}
+    assert visible["restricted"] == {"alice"}
+    assert visible["restricted+unrestricted"] == everyone
+    assert visible["unrelated+unrestricted"] == everyone
+    assert visible["inherited"] == {"alice"}
+    assert visible["manage"] == {"alice", "bob"}
+    assert visible["manage implies read"] == everyone
+    assert visible["no grant"] == set()
+
+
+def test_policy_for_unwired_action_is_rejected(run_db):
+    async def run():
+        roles = await _setup()
+        with pytest.raises(HTTPException) as exc:
+            await role_controller.create_policy(
+                roles["unrestricted"].id,
+                RowPolicyCreate(resource="user", action="update", condition={"username": "alice"}),
+            )
+        return exc.value.status_code
+
+    assert run_db(run) == 400
@@ -0,0 +1,62 @@
+"""会话纪元：Redis 中纪元丢失后，只有当前会话的 token 能通过校验"""
+
+from datetime import datetime
+
+from fastapi import HTTPException
+
+from core.session import bump_session_epoch, epoch_cache, verify_session_epoch
+from models.user import User
+from schemas.auth import JWTDecoder
+
+
+def _payload(user: User, epoch: int) -> JWTDecoder:
+    return JWTDecoder(
+        user_id=user.id,
+        username=user.username,
+        is_superuser=False,
+        login_time=int(user.last_login.timestamp()),
+        session_epoch=epoch,
+        type="access",
+        exp=0,
+    )
+
+
+async def _accepted(payload: JWTDecoder) -> bool:
+    try:
+        await verify_session_epoch(payload)
+    except HTTPException as e:
+        assert e.status_code == 401
+        return False
+    return True
+
+
+def test_rotated_and_logged_out_tokens_stay_invalid_after_epoch_loss(run_db, memory_redis):
+    async def run():
+        user = await User.create(username="alice", password="x", last_login=datetime.now())
+
+        def lose_epochs():
+            memory_redis.data.clear()
+            epoch_cache.clear()
+
+        login = _payload(user, await bump_session_epoch(user.id))
+        refreshed = _payload(user, await bump_session_epoch(user.id))
+        lose_epochs()
+        # 被轮换的 token 先到达，不能抢占纪元
+        results = {"rotated": await _accepted(login), "current": await _accepted(refreshed)}
+
+        await bump_session_epoch(user.id)
+        lose_epochs()
+        results["logged out"] = await _accepted(refreshed)
+        return results
+
+    assert run_db(run) == {"rotated": False, "current": True, "logged out": False}
+
+
+def test_tokens_issued_before_epoch_records_fall_back_to_login_time(run_db, memory_redis):
+    async def run():
+        user = await User.create(username="bob", password="x", last_login=datetime.now())
+        current = _payload(user, 5)
+        stale = current.model_copy(update={"login_time": current.login_time - 60})
+        return await _accepted(stale), await _accepted(current)
+
+    assert run_db(run) == (False, True)
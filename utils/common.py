@@ -21,16 +21,24 @@ class ResponseSchema(BaseModel, Generic[DataT]):
     data: Optional[Union[DataT, list, dict]] = None  # 明确支持list和dict
     message: str = "操作成功"
 
+    def model_post_init(self, __context) -> None:
+        # 路由开启 response_model_exclude_unset（按 fields 返回部分字段）时 code、message 仍然输出
+        self.__pydantic_fields_set__.update(("code", "message"))
+
     class Config:
         json_schema_extra = {"example": {"code": 0, "data": {}, "message": "操作成功"}}
 
 
 # 统一响应格式
 class Pagination(BaseModel):
-    total: int
+    total: Optional[int]  # count=none 时为空
     page: int
     page_size: int
-    pages: int
+    pages: Optional[int]
+    total_exact: bool = True  # 总数是否为精确值（count=estimated 时可能为估算或缓存值）
+    # 游标分页（请求携带 cursor 参数）时返回
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
 
 class PaginationResponse(BaseModel, Generic[DataT]):
@@ -8,7 +8,7 @@ async def get_object_or_404(model: QuerySet | Model, **kwargs):
     try:
         return await model.get(**kwargs)
     except DoesNotExist:
-        model_name = model.__name__
+        model_name = getattr(model, "model", model).__name__
         # A simple way to build a detail message.
         # You might want a more robust way to pluralize/name models.
         raise HTTPException(status_code=404, detail=f"{model_name} not found")
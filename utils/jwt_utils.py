@@ -1,3 +1,4 @@
+import uuid
 from datetime import datetime, timedelta
 from enum import StrEnum
 
@@ -12,7 +13,7 @@ class TokenType(StrEnum):
     REFRESH = "refresh"
 
 def create_access_token(token_type: TokenType, data: JWTPayload) -> str:
-    payload = data.model_dump().copy()
+    payload = data.model_dump(exclude_none=True)
     if token_type == TokenType.ACCESS:
         expire = datetime.utcnow() + timedelta(
             days=settings.ACCESS_TOKEN_EXPIRE_DAYS
@@ -23,6 +24,7 @@ def create_access_token(token_type: TokenType, data: JWTPayload) -> str:
         )
     payload["type"] = token_type.value
     payload["exp"] = expire
+    payload["jti"] = uuid.uuid4().hex
     encoded_jwt = jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
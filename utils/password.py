@@ -1,7 +1,32 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException
 from passlib import pwd
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+from config import settings
+
+
+def _argon2_options() -> dict[str, int]:
+    """根据配置生成 argon2 参数，未配置的项使用 passlib 默认值"""
+    options = {}
+    if settings.ARGON2_TIME_COST:
+        options["argon2__time_cost"] = settings.ARGON2_TIME_COST
+        # 迭代次数低于配置值的旧哈希视为需要更新
+        options["argon2__min_rounds"] = settings.ARGON2_TIME_COST
+    if settings.ARGON2_MEMORY_COST:
+        options["argon2__memory_cost"] = settings.ARGON2_MEMORY_COST
+    if settings.ARGON2_PARALLELISM:
+        options["argon2__parallelism"] = settings.ARGON2_PARALLELISM
+    return options
+
+
+pwd_context = CryptContext(schemes=["argon2"], deprecated="auto", **_argon2_options())
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -12,5 +37,118 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def needs_rehash(hashed_password: str) -> bool:
+    """哈希参数与当前配置不一致时返回 True，只解析哈希串，不做哈希计算"""
+    return pwd_context.needs_update(hashed_password)
+
+
 def generate_password() -> str:
     return pwd.genword()
+
+
+class PasswordHasher:
+    """
+    异步密码哈希服务
+
+    argon2 计算会阻塞事件循环，这里将其放到独立进程池中执行；
+    排队中的任务数达到上限时直接拒绝，避免登录洪峰拖慢其他接口。
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers  # 0 表示在当前进程内同步执行
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._restarts = 0
+        self._total_seconds = 0.0
+        self._max_seconds = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor) -> None:
+        """丢弃已损坏的进程池，下次提交时重建；并发请求可能同时发现损坏，只重建一次"""
+        if self._executor is executor:
+            self._executor = None
+            self._restarts += 1
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _submit(self, func: Callable[..., Any], *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        try:
+            return await loop.run_in_executor(executor, func, *args)
+        except BrokenProcessPool:
+            # 工作进程异常退出（如被 OOM 杀死）后进程池不再接受任务，重建后重试一次
+            self._discard_executor(executor)
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self._pending >= self.max_pending:
+            self._rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="服务繁忙，请稍后重试",
+                headers={"Retry-After": "1"},
+            )
+
+        self._pending += 1
+        self._submitted += 1
+        start = time.perf_counter()
+        try:
+            if self.max_workers <= 0:
+                result = func(*args)
+            else:
+                result = await self._submit(func, *args)
+        except Exception:
+            self._failed += 1
+            raise
+        finally:
+            self._pending -= 1
+            elapsed = time.perf_counter() - start
+            self._total_seconds += elapsed
+            self._max_seconds = max(self._max_seconds, elapsed)
+
+        self._completed += 1
+        return result
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict[str, Any]:
+        finished = self._completed + self._failed
+        return {
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "submitted": self._submitted,
+            "completed": self._completed,
+            "failed": self._failed,
+            "rejected": self._rejected,
+            "restarts": self._restarts,
+            "avg_seconds": self._total_seconds / finished if finished else 0.0,
+            "max_seconds": self._max_seconds,
+        }
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
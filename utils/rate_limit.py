@@ -0,0 +1,136 @@
+import math
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+
+from fastapi import Depends, HTTPException, Request
+from fastapi.security import OAuth2PasswordRequestForm
+
+from config import settings
+from core.redis_manager import redis_manager
+from utils.operation_logger import OperationLogger
+
+# 滑动窗口限流脚本：移除窗口外的记录后判断剩余次数，整个过程在 Redis 中原子执行
+# 返回 {是否允许, 需要等待的毫秒数}
+SLIDING_WINDOW_SCRIPT = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+
+redis.call('ZREMRANGEBYSCORE', key, 0, now - window)
+if redis.call('ZCARD', key) < limit then
+    redis.call('ZADD', key, now, ARGV[4])
+    redis.call('PEXPIRE', key, window)
+    return {1, 0}
+end
+
+local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+return {0, tonumber(oldest[2]) + window - now}
+"""
+
+
+class RateLimitBackend(ABC):
+    """限流存储后端"""
+
+    @abstractmethod
+    async def hit(self, key: str, limit: int, window: int) -> tuple[bool, float]:
+        """
+        记录一次请求
+
+        Args:
+            key: 限流键
+            limit: 窗口内允许的最大请求数
+            window: 窗口长度（秒）
+
+        Returns:
+            tuple: (是否允许, 需要等待的秒数)
+        """
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """基于 Redis 有序集合的滑动窗口，多进程、多节点共享计数"""
+
+    async def hit(self, key: str, limit: int, window: int) -> tuple[bool, float]:
+        now = int(time.time() * 1000)
+        allowed, retry_after = await redis_manager.eval_script(
+            SLIDING_WINDOW_SCRIPT,
+            keys=[key],
+            args=[now, window * 1000, limit, f"{now}:{uuid.uuid4().hex}"],
+        )
+        return bool(allowed), int(retry_after) / 1000
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """进程内滑动窗口，仅用于测试与单进程开发环境"""
+
+    def __init__(self):
+        self._hits: dict[str, deque[float]] = {}
+
+    async def hit(self, key: str, limit: int, window: int) -> tuple[bool, float]:
+        now = time.monotonic()
+        hits = self._hits.setdefault(key, deque())
+        while hits and hits[0] <= now - window:
+            hits.popleft()
+
+        if len(hits) < limit:
+            hits.append(now)
+            return True, 0.0
+        return False, hits[0] + window - now
+
+    def reset(self) -> None:
+        self._hits.clear()
+
+
+class SlidingWindowRateLimiter:
+    """滑动窗口限流器，超出限制时抛出 429"""
+
+    def __init__(self, backend: RateLimitBackend, prefix: str, limit: int, window: int):
+        self.backend = backend
+        self.prefix = prefix
+        self.limit = limit
+        self.window = window
+
+    async def check(self, identifier: str) -> None:
+        allowed, retry_after = await self.backend.hit(
+            f"{self.prefix}:{identifier}", self.limit, self.window
+        )
+        if not allowed:
+            raise HTTPException(
+                status_code=429,
+                detail="请求过于频繁，请稍后重试",
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+
+
+def create_rate_limit_backend() -> RateLimitBackend:
+    if settings.RATE_LIMIT_BACKEND == "memory":
+        return MemoryRateLimitBackend()
+    return RedisRateLimitBackend()
+
+
+rate_limit_backend = create_rate_limit_backend()
+
+login_ip_limiter = SlidingWindowRateLimiter(
+    rate_limit_backend,
+    prefix="ratelimit:login:ip",
+    limit=settings.LOGIN_RATE_LIMIT_PER_IP,
+    window=settings.LOGIN_RATE_LIMIT_WINDOW,
+)
+login_user_limiter = SlidingWindowRateLimiter(
+    rate_limit_backend,
+    prefix="ratelimit:login:user",
+    limit=settings.LOGIN_RATE_LIMIT_PER_USER,
+    window=settings.LOGIN_RATE_LIMIT_WINDOW,
+)
+
+
+async def check_login_rate_limit(
+    request: Request, login_data: OAuth2PasswordRequestForm = Depends()
+) -> None:
+    """登录限流依赖，按客户端IP与用户名分别计数，在密码校验之前执行"""
+    client_ip = OperationLogger._get_client_ip(request)
+    if client_ip:
+        await login_ip_limiter.check(client_ip)
+    await login_user_limiter.check(login_data.username)
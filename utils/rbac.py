@@ -1,9 +1,12 @@
 from functools import wraps
-from typing import List, Union, Callable
+from typing import List, Type, Union, Callable
 from fastapi import HTTPException, Depends
 from fastapi.security import HTTPBearer
+from tortoise.models import Model
+from tortoise.queryset import QuerySet
 
 from core.deps import get_current_active_user
+from core.row_policy import scoped_query
 from models.user import User
 
 security = HTTPBearer()
@@ -56,13 +59,7 @@ def require_roles(roles: Union[str, List[str]]):
                 raise HTTPException(status_code=500, detail="缺少用户认证信息")
             
             # 检查角色
-            has_role = False
-            for role_code in roles:
-                if await current_user.has_role(role_code):
-                    has_role = True
-                    break
-            
-            if not has_role:
+            if not await current_user.has_any_role(roles):
                 raise HTTPException(
                     status_code=403, 
                     detail=f"权限不足: 需要以下角色之一 {', '.join(roles)}"
@@ -125,6 +122,15 @@ def get_current_superuser_or_permission(resource: str, action: str):
     return checker
 
 
+def get_row_scope(resource: str, action: str, model: Type[Model]):
+    """校验 resource:action 权限，并返回应用行级策略后的查询集，用作 CRUDBase.list / get 的 base_query"""
+    async def scope(
+        current_user: User = Depends(get_current_superuser_or_permission(resource, action))
+    ) -> QuerySet:
+        return await scoped_query(current_user, resource, action, model)
+    return scope
+
+
 # 常用权限组合
 def require_user_management():
     """用户管理权限"""
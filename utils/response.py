@@ -0,0 +1,77 @@
+"""
+响应序列化
+
+FastAPI 默认流程：按 response_model 校验返回值 → 转换为 Python 字典 → json.dumps。
+SchemaRoute 将 ResponseSchema 返回值按 response_model 校验一次后直接由 pydantic-core 输出 JSON 字节，
+省去中间字典与 json.dumps；TypeAdapter 按具体的 ResponseSchema[...] 类型缓存。
+"""
+
+import inspect
+from functools import wraps
+from typing import Any, Callable
+
+from fastapi.exceptions import ResponseValidationError
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from pydantic_core import to_json
+
+from utils.common import ResponseSchema
+
+_adapters: dict[Any, TypeAdapter] = {}
+
+
+def get_type_adapter(tp: Any) -> TypeAdapter:
+    adapter = _adapters.get(tp)
+    if adapter is None:
+        adapter = _adapters[tp] = TypeAdapter(tp)
+    return adapter
+
+
+class SchemaJSONResponse(JSONResponse):
+    """使用 pydantic-core 编码的 JSON 响应，内容为 bytes 时视为已编码直接输出"""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        if isinstance(content, BaseModel):
+            return get_type_adapter(type(content)).dump_json(content)
+        return to_json(content)
+
+
+class SchemaRoute(APIRoute):
+    """
+    返回 ResponseSchema 的路由直接输出 JSON 字节
+
+    校验规则与 FastAPI 相同（from_attributes，支持 response_model_exclude_unset 等选项），只校验一次。
+    端点返回 Response 时直接透传；同步端点不做处理；不适用于通过注入 Response 参数修改响应头的端点。
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        if inspect.iscoroutinefunction(endpoint):
+            original = endpoint
+
+            @wraps(original)
+            async def endpoint(*args, **kw):
+                content = await original(*args, **kw)
+                if not isinstance(content, ResponseSchema) or self.response_model is None:
+                    return content
+                return SchemaJSONResponse(self.render(content), status_code=self.status_code or 200)
+
+        super().__init__(path, endpoint, **kwargs)
+
+    def render(self, content: ResponseSchema) -> bytes:
+        adapter = get_type_adapter(self.response_model)
+        try:
+            value = adapter.validate_python(content, from_attributes=True)
+        except ValidationError as e:
+            raise ResponseValidationError(errors=e.errors(), body=content)
+        return adapter.dump_json(
+            value,
+            include=self.response_model_include,
+            exclude=self.response_model_exclude,
+            by_alias=self.response_model_by_alias,
+            exclude_unset=self.response_model_exclude_unset,
+            exclude_defaults=self.response_model_exclude_defaults,
+            exclude_none=self.response_model_exclude_none,
+        )